@@ -0,0 +1,94 @@
+# Compares website crawl throughput (pages/sec) of the thread-pool path
+# (ThreadPoolExecutor(max_workers=10) + crawl_and_aggregate) against the asyncio
+# AsyncCrawler, using local http.server fixtures. Each fixture server is a separate
+# "host" (its own port), serving a small linked site with contact details over
+# HTTP/1.1 keep-alive, so the connection counts show how well connections are reused.
+# The contact details are only on the last linked page, so early stop does not cut the
+# crawls short and every page of every site is fetched. Throughput counts the pages the
+# servers actually served.
+#
+# Usage: python benchmarks/crawl_engine_bench.py [--sites 40] [--pages 5] [--latency 0.02]
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scraper.crawl import crawl_and_aggregate, crawl_websites_async
+from scraper.http_pool import ConnectionStats, SessionPool
+PAGES_SERVED = count()
+def make_handler(pages, latency):
+    class SiteHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+       
+        def do_GET(self):
+            time.sleep(latency) # Simulated network/server time
+            if self.path == '/robots.txt':
+                body = b'User-agent: *\nAllow: /\n'
+                content_type = 'text/plain'
+            else:
+                next(PAGES_SERVED)
+                links = ''.join(f'<a href="/page{i}">Page {i}</a> ' for i in range(pages))
+                contacts = ''
+                if self.path == f'/page{pages - 1}':
+                    contacts = (f'<p>Call (555) 123-{self.server.server_port % 10000:04d} or write to '
+                                f'<a href="mailto:info@site{self.server.server_port}.example">us</a>.</p>'
+                                f'<a href="https://facebook.com/site{self.server.server_port}">Facebook</a>')
+                body = (f'<html><body><h1>Business {self.server.server_port}</h1>'
+                        f'{contacts}{links}</body></html>').encode()
+                content_type = 'text/html; charset=utf-8'
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        def log_message(self, *args):
+            pass
+    return SiteHandler
+def start_sites(count, pages, latency):
+    servers = []
+    for _ in range(count):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(pages, latency))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+def quiet(message):
+    pass
+def run_thread_pool(urls, depth, pages):
+    pool = SessionPool()
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        results = list(executor.map(lambda url: crawl_and_aggregate(url, depth, pages, True, quiet, pool), urls))
+    pool.close()
+    return results, pool.stats
+def run_async(urls, depth, pages):
+    stats = ConnectionStats()
+    return asyncio.run(crawl_websites_async(urls, depth, pages, True, quiet, stats=stats)), stats
+def main():
+    parser = argparse.ArgumentParser(description='Thread-pool vs asyncio crawl throughput')
+    parser.add_argument('--sites', type=int, default=40)
+    parser.add_argument('--pages', type=int, default=5, help='pages per site')
+    parser.add_argument('--latency', type=float, default=0.02, help='server-side delay per response (s)')
+    args = parser.parse_args()
+   
+    servers = start_sites(args.sites, args.pages, args.latency)
+    urls = [f'http://127.0.0.1:{s.server_port}/' for s in servers]
+    try:
+        for name, runner in (('thread-pool', run_thread_pool), ('asyncio', run_async)):
+            served = next(PAGES_SERVED)
+            started = time.perf_counter()
+            # Each site has a root page plus `pages` linked pages
+            results, stats = runner(urls, 1, args.pages + 1)
+            elapsed = time.perf_counter() - started
+            total_pages = next(PAGES_SERVED) - served - 1
+            found = sum(1 for r in results if r[0] != 'Not found')
+            print(f"{name:12s} {total_pages} pages in {elapsed:6.2f}s -> {total_pages / elapsed:7.1f} pages/sec ({found}/{len(urls)} sites with emails)")
+            print(f"{'':12s} {stats}")
+    finally:
+        for server in servers:
+            server.shutdown()
+if __name__ == '__main__':
+    main()
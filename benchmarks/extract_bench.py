@@ -0,0 +1,100 @@
+# Microbenchmark for page extraction: CPU time per page of the single-pass
+# extract_page (for every installed parser backend) against the previous
+# BeautifulSoup implementation, which rebuilt the tree, ran get_text and then
+# scanned the anchors three more times. Also checks that every backend finds the
+# same contacts as the BeautifulSoup baseline.
+#
+# Usage: python benchmarks/extract_bench.py [--corpus DIR_OF_HTML_FILES] [--repeat 5]
+# Without --corpus a synthetic corpus of business pages is generated.
+import argparse
+import glob
+import os
+import random
+import re
+import sys
+import time
+from urllib.parse import urljoin
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scraper import extract
+def legacy_extract_page(html, page_url):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    text_content = soup.get_text(separator=' ')
+    page_emails = set(extract.EMAIL_REGEX.findall(text_content))
+    for link in soup.find_all('a', href=re.compile(r'^mailto:', re.I)):
+        email = link['href'][7:].split('?')[0].strip()
+        if email:
+            page_emails.add(email)
+    page_addresses = set(m.group(0).strip() for m in extract.ADDRESS_REGEX.finditer(text_content))
+    page_phones = set(m.group(0).strip() for m in extract.PHONE_REGEX.finditer(text_content))
+    for link in soup.find_all('a', href=re.compile(r'^tel:', re.I)):
+        phone = link['href'][4:].strip()
+        if phone:
+            page_phones.add(phone)
+    page_social = set()
+    for link in soup.find_all('a', href=True):
+        if extract.SOCIAL_REGEX.match(link['href']):
+            page_social.add(link['href'])
+    links = [urljoin(page_url, link['href']) for link in soup.find_all('a', href=True)]
+    return {'emails': page_emails, 'addresses': page_addresses, 'phones': page_phones,
+            'social_media': page_social, 'links': links}
+def synthetic_corpus(count, seed=1):
+    rng = random.Random(seed)
+    pages = []
+    for n in range(count):
+        paragraphs = ''.join(
+            f'<p>{" ".join(rng.choice(["lorem", "ipsum", "dolor", "sit", "amet", "&amp;", "caf&eacute;"]) for _ in range(60))}</p>'
+            for _ in range(rng.randint(5, 40)))
+        nav = ''.join(f'<li><a href="/section{i}/page{rng.randint(0, 99)}">Section {i}</a></li>' for i in range(rng.randint(10, 60)))
+        pages.append(
+            f'<!DOCTYPE html><html><head><title>Business {n}</title>'
+            f'<style>.x{{color:red}}</style><script>var tracker = "noreply@tracker.example";</script></head>'
+            f'<body><nav><ul>{nav}</ul></nav><main>{paragraphs}'
+            f'<p>Visit us at 12 Main Street, Springfield, IL 62701 or call (555) 010-{n % 10000:04d}.</p></main>'
+            f'<footer><a href="mailto:info@business{n}.example?subject=Hi">Email</a> '
+            f'<a href="tel:+15550100{n % 100:02d}">Call</a> '
+            f'<a href="https://www.facebook.com/business{n}">Facebook</a> '
+            f'<a href="https://instagram.com/business{n}">Instagram</a><!-- footer --></footer></body></html>')
+    return pages
+def load_corpus(path):
+    pages = []
+    for name in sorted(glob.glob(os.path.join(path, '**', '*.htm*'), recursive=True)):
+        with open(name, 'rb') as f:
+            pages.append(f.read().decode('utf-8', errors='replace'))
+    return pages
+def measure(extract, pages, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.process_time()
+        for page in pages:
+            extract(page, 'https://example.com/')
+        elapsed = time.process_time() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(pages)
+def main():
+    parser = argparse.ArgumentParser(description='Page extraction CPU time per page')
+    parser.add_argument('--corpus', help='directory of saved .html pages')
+    parser.add_argument('--pages', type=int, default=200, help='synthetic pages when no corpus is given')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+   
+    pages = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.pages)
+    if not pages:
+        sys.exit(f"No HTML files found in {args.corpus}")
+    print(f"{len(pages)} pages, {sum(len(p) for p in pages) / len(pages) / 1024:.1f} KiB average")
+   
+    candidates = [('bs4 (previous)', legacy_extract_page)]
+    for backend in extract.available_backends():
+        candidates.append((f'single-pass/{backend}', lambda html, url, backend=backend: extract.extract_page(html, url, backend)))
+   
+    baseline = [legacy_extract_page(page, 'https://example.com/') for page in pages]
+    baseline_time = None
+    for name, extractor in candidates:
+        mismatches = sum(1 for page, expected in zip(pages, baseline)
+                         if any(extractor(page, 'https://example.com/')[key] != expected[key]
+                                for key in ('emails', 'addresses', 'phones', 'social_media')))
+        per_page = measure(extractor, pages, args.repeat)
+        baseline_time = baseline_time or per_page
+        print(f"{name:24s} {per_page * 1000:8.3f} ms CPU/page  {baseline_time / per_page:5.2f}x  ({mismatches} pages differ from baseline)")
+if __name__ == '__main__':
+    main()
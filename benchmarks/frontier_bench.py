@@ -0,0 +1,116 @@
+# Pages fetched per business by the old breadth-first crawl (plain deque, dedup on the
+# raw URL only) against the prioritized frontier, with the contact yield of each.
+# Every fixture site has a home page, a blog archive with paginated posts, PDFs and
+# images, tracking/fragment/trailing-slash link variants, a footer link to a page with
+# the phone number and an /about page two clicks deep with the email address.
+#
+# Usage: python benchmarks/frontier_bench.py [--sites 20] [--posts 40]
+import argparse
+import asyncio
+import os
+import sys
+import threading
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scraper.config import DEFAULT_DEPTH, DEFAULT_MAX_PAGES
+from scraper.crawl import aggregate_results, crawl_websites_async
+from scraper.extract import extract_page
+from scraper.http_pool import SessionPool
+NAV = ('<nav><a href="/">Home</a> <a href="/services">Services</a> <a href="/services/">Services</a> '
+       '<a href="/blog/">Blog</a> <a href="/?utm_source=nav&utm_medium=web">Home</a> <a href="#top">Top</a> '
+       '<a href="/menu.pdf">Menu</a> <a href="/img/storefront.jpg">Photo</a></nav>')
+def make_handler(posts, fetches):
+    class SiteHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+   
+        def do_GET(self):
+            port = self.server.server_port
+            fetches[port] += 1
+            path = urlparse(self.path).path
+            footer = '<footer><a href="/info">Visit us</a></footer>'
+            if path == '/info':
+                content = f'<p>Call (555) 201-{port % 10000:04d}</p>'
+            elif path == '/services':
+                content = '<p>What we do.</p><a href="/about">Who we are</a> <a href="/services?ref=home#prices">Prices</a>'
+            elif path == '/about':
+                content = f'<p>Write to <a href="mailto:hello@site{port}.example">hello</a>.</p>'
+            elif path.startswith('/blog'):
+                page = int(path.rsplit('/', 1)[-1]) if path.startswith('/blog/page/') else 1
+                first = (page - 1) * 5
+                content = ''.join(f'<a href="/blog/2023/05/post-{i}">Post {i}</a> ' for i in range(first, min(first + 5, posts)))
+                content += f'<a href="/blog/page/{page + 1}">Older</a>'
+            else:
+                content = '<p>Welcome to our business.</p>'
+            body = f'<html><body>{NAV}{content}{footer}</body></html>'.encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        def log_message(self, *args):
+            pass
+    return SiteHandler
+def quiet(message):
+    pass
+def legacy_crawl(start_url, max_depth, max_pages, pool):
+    # The breadth-first loop the crawlers used before the frontier (without the politeness sleep)
+    base_domain = urlparse(start_url).netloc
+    visited = set()
+    queue = deque([(start_url, 0)])
+    found = {'emails': set(), 'addresses': set(), 'phones': set(), 'social_media': set()}
+    pages_visited = 0
+    while queue and pages_visited < max_pages:
+        url, depth = queue.popleft()
+        if url in visited or depth > max_depth:
+            continue
+        visited.add(url)
+        pages_visited += 1
+        try:
+            response = pool.get(url, timeout=5)
+            response.raise_for_status()
+        except Exception:
+            continue
+        page = extract_page(response.text, url)
+        for field, values in found.items():
+            values.update(page[field])
+        for next_url in page['links']:
+            if urlparse(next_url).netloc == base_domain and next_url not in visited:
+                queue.append((next_url, depth + 1))
+    return aggregate_results(**found)
+def run_legacy(urls, depth, pages):
+    pool = SessionPool()
+    results = [legacy_crawl(url, depth, pages, pool) for url in urls]
+    pool.close()
+    return results
+def run_frontier(urls, depth, pages):
+    return asyncio.run(crawl_websites_async(urls, depth, pages, False, quiet, delay=0))
+def main():
+    parser = argparse.ArgumentParser(description='Breadth-first crawl vs prioritized frontier: pages fetched per business')
+    parser.add_argument('--sites', type=int, default=20)
+    parser.add_argument('--posts', type=int, default=40, help='blog posts per site')
+    parser.add_argument('--depth', type=int, default=DEFAULT_DEPTH)
+    parser.add_argument('--max-pages', type=int, default=DEFAULT_MAX_PAGES)
+    args = parser.parse_args()
+   
+    fetches = Counter()
+    servers = []
+    for _ in range(args.sites):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(args.posts, fetches))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    urls = [f'http://127.0.0.1:{s.server_port}/' for s in servers]
+    try:
+        for name, runner in (('breadth-first', run_legacy), ('frontier', run_frontier)):
+            fetches.clear()
+            results = runner(urls, args.depth, args.max_pages)
+            emails = sum(1 for r in results if r[0] != 'Not found')
+            phones = sum(1 for r in results if r[2] != 'Not found')
+            print(f"{name:14s} {sum(fetches.values()) / len(urls):5.1f} pages fetched per business "
+                  f"(max {max(fetches.values())}); emails {emails}/{len(urls)}, phones {phones}/{len(urls)}")
+    finally:
+        for server in servers:
+            server.shutdown()
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# Times scrape_google_maps_async against a local static page that mimics the Maps
+# results feed (benchmarks/fixtures/maps_feed.html): lazy-loading on scroll, a detail
+# view per result and history navigation back to the list. Reports how the wall time
+# splits into waiting on the page versus working, next to the fixed sleeps the
+# previous loop spent (3 s + 1.5 s per scroll + 2 s per click + 2 s per go_back).
+# Each detail mode is run in turn to compare per-record latency: 'always' opens every
+# place, 'missing' only those whose listing card lacks a required field, 'never' reads
+# listing cards only.
+#
+# Needs Chromium for Playwright (playwright install chromium).
+# Usage: python benchmarks/maps_feed_bench.py [--results 20] [--total 40] [--delay-ms 300]
+import argparse
+import asyncio
+import functools
+import os
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scraper import maps
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+def serve_fixtures():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(QuietHandler, directory=FIXTURES))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+def fixed_sleep_seconds(max_results, loaded):
+    scrolls = max(2, max_results // 20 + 1)
+    return 3 + 1.5 * scrolls + 4 * loaded
+async def run(args, base_url, **options):
+    maps.MAPS_SEARCH_URL = (f'{base_url}/maps_feed.html?q={{query}}&total={args.total}'
+                            f'&scroll_ms={args.delay_ms}&detail_ms={args.delay_ms}')
+    timer = maps.WaitTimer()
+    started = time.perf_counter()
+    records = await maps.scrape_google_maps_async('fixture', args.results, False, lambda message: None,
+                                                  lambda value: None, timer=timer, **options)
+    return records, time.perf_counter() - started, timer
+def main():
+    parser = argparse.ArgumentParser(description='Maps result loop timing on a local feed fixture')
+    parser.add_argument('--results', type=int, default=20, help='max_results to scrape')
+    parser.add_argument('--total', type=int, default=40, help='results the fixture feed can load')
+    parser.add_argument('--delay-ms', type=int, default=300, help='fixture delay for lazy loads and detail views')
+    args = parser.parse_args()
+   
+    server = serve_fixtures()
+    try:
+        for mode in ('always', 'missing', 'never'):
+            records, elapsed, timer = asyncio.run(run(args, f'http://127.0.0.1:{server.server_port}', detail_mode=mode))
+            with_website = sum(1 for record in records if record['website'])
+            print(f"{mode:8s} {len(records)} records ({with_website} with website) in {elapsed:.1f}s -> "
+                  f"{elapsed / max(len(records), 1) * 1000:.0f} ms/record")
+            print(f"         {timer}")
+    finally:
+        server.shutdown()
+    print(f"previous fixed sleeps alone for {args.results} records: {fixed_sleep_seconds(args.results, args.results):.1f}s")
+if __name__ == '__main__':
+    main()
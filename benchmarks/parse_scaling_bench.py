@@ -0,0 +1,57 @@
+# Parse throughput (pages/sec) of AsyncCrawler.parse as the number of parse worker
+# processes grows, on a saved-page corpus. Pages go in as raw bytes, as they come off
+# the network, and every page is submitted at once, so the parse backlog limit is what
+# holds the submitters back. 0 workers parses on the event loop's thread pool (one core).
+#
+# Usage: python benchmarks/parse_scaling_bench.py [--corpus DIR_OF_HTML_FILES] [--workers 0,1,2,4,8]
+# Without --corpus the synthetic corpus from extract_bench.py is used.
+import argparse
+import asyncio
+import glob
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from extract_bench import synthetic_corpus
+from scraper.crawl import AsyncCrawler
+def quiet(message):
+    pass
+async def parse_all(workers, bodies, repeat):
+    async with AsyncCrawler(1, 1, False, quiet, parse_workers=workers) as crawler:
+        # Warm up: start every worker process and import the parser in it
+        await asyncio.gather(*(crawler.parse(body, 'https://example.com/') for body in bodies[:max(workers, 1) * 2]))
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await asyncio.gather(*(crawler.parse(body, 'https://example.com/', 'text/html; charset=utf-8') for body in bodies))
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+def main():
+    parser = argparse.ArgumentParser(description='Parse throughput by number of parse worker processes')
+    parser.add_argument('--corpus', help='directory of saved .html pages')
+    parser.add_argument('--pages', type=int, default=400, help='synthetic pages when no corpus is given')
+    parser.add_argument('--workers', default=f'0,1,2,4,{os.cpu_count() or 1}', help='comma-separated worker counts')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+   
+    if args.corpus:
+        bodies = []
+        for name in sorted(glob.glob(os.path.join(args.corpus, '**', '*.htm*'), recursive=True)):
+            with open(name, 'rb') as f:
+                bodies.append(f.read())
+    else:
+        bodies = [page.encode('utf-8') for page in synthetic_corpus(args.pages)]
+    if not bodies:
+        sys.exit(f"No HTML files found in {args.corpus}")
+    print(f"{len(bodies)} pages, {sum(len(b) for b in bodies) / len(bodies) / 1024:.1f} KiB average, {os.cpu_count()} CPU cores")
+   
+    baseline = None
+    for workers in sorted({int(w) for w in args.workers.split(',')}):
+        elapsed = asyncio.run(parse_all(workers, bodies, args.repeat))
+        rate = len(bodies) / elapsed
+        baseline = baseline or rate
+        label = 'thread' if workers == 0 else f'{workers} process' + ('es' if workers > 1 else '')
+        print(f"{label:14s} {rate:8.1f} pages/sec  {rate / baseline:5.2f}x")
+if __name__ == '__main__':
+    main()
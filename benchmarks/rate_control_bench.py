@@ -0,0 +1,105 @@
+# Fixed politeness delay without retries (the old crawler) against the adaptive rate
+# controller, on three local hosts with scripted behaviour:
+#   throttled - answers 429 with Retry-After: 1 to requests closer than --min-gap apart
+#   flaky     - answers 502 to every --fail-every'th request
+#   fast      - always answers 200
+# Every page carries a distinct phone number, so the phones found per host show how many
+# pages were actually read.
+#
+# Usage: python benchmarks/rate_control_bench.py [--pages 20] [--min-gap 0.8] [--fail-every 4]
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scraper.crawl import AsyncCrawler
+from scraper.rate_control import RateController
+def make_handler(pages, behaviour, min_gap, fail_every, served):
+    lock = threading.Lock()
+    last_request = [0.0]
+    class SiteHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+   
+        def do_GET(self):
+            with lock:
+                now = time.monotonic()
+                too_soon = now - last_request[0] < min_gap
+                last_request[0] = now
+                served['requests'] += 1
+                if behaviour == 'throttled' and too_soon:
+                    status = 429
+                elif behaviour == 'flaky' and served['requests'] % fail_every == 0:
+                    status = 502
+                else:
+                    status = 200
+                served[status] += 1
+            if status == 200:
+                number = int(self.path.rsplit('-', 1)[-1]) if '-' in self.path else 0
+                links = ''.join(f'<a href="/contact-{i}">Office {i}</a> ' for i in range(1, pages + 1))
+                body = (f'<html><body><p>Call (555) 300-{number:04d} or <a href="mailto:office@{behaviour}.example">write</a>.</p>'
+                        f'{links}</body></html>').encode()
+            else:
+                body = b'Try again later'
+            self.send_response(status)
+            if status == 429:
+                self.send_header('Retry-After', '1')
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        def log_message(self, *args):
+            pass
+    return SiteHandler
+class FixedRate(RateController):
+    # The old behaviour: a flat delay per host, no adaptation and no retries
+    def record(self, host, status, retry_after=None):
+        pass
+   
+    def retry_delay(self, host, attempt):
+        return None
+def quiet(message):
+    pass
+async def crawl_hosts(urls, pages, rate):
+    async with AsyncCrawler(1, pages + 1, False, quiet, per_host=2, rate=rate) as crawler:
+        return await crawler.crawl_many(urls)
+def main():
+    parser = argparse.ArgumentParser(description='Fixed delay vs adaptive per-host rate control')
+    parser.add_argument('--pages', type=int, default=20, help='linked pages per host')
+    parser.add_argument('--min-gap', type=float, default=0.8, help='seconds the throttled host wants between requests')
+    parser.add_argument('--fail-every', type=int, default=4, help='the flaky host fails every n-th request')
+    parser.add_argument('--log', action='store_true', help='print the rate controller log')
+    args = parser.parse_args()
+   
+    behaviours = ('throttled', 'flaky', 'fast')
+    served = {behaviour: Counter() for behaviour in behaviours}
+    servers = []
+    for behaviour in behaviours:
+        handler = make_handler(args.pages, behaviour, args.min_gap, args.fail_every, served[behaviour])
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    urls = [f'http://127.0.0.1:{s.server_port}/' for s in servers]
+    try:
+        for name, rate in (('fixed 0.5s', FixedRate()), ('adaptive', RateController(update_callback=print if args.log else None))):
+            for counter in served.values():
+                counter.clear()
+            started = time.perf_counter()
+            results = asyncio.run(crawl_hosts(urls, args.pages, rate))
+            elapsed = time.perf_counter() - started
+            print(f"{name} ({elapsed:.1f}s)")
+            for behaviour, result in zip(behaviours, results):
+                phones = 0 if result[2] == 'Not found' else len(result[2].split('; '))
+                counts = served[behaviour]
+                print(f"  {behaviour:10s} {phones:3d}/{args.pages + 1} pages read, {counts['requests']:3d} requests "
+                      f"({counts[429]} x 429, {counts[502]} x 502)")
+            if not isinstance(rate, FixedRate):
+                print(f"  {rate}")
+    finally:
+        for server in servers:
+            server.shutdown()
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,315 @@
+# End-to-end crawl benchmark on a synthetic farm of business websites, served from a
+# local aiohttp server, so crawl and extraction changes can be measured offline and
+# compared run to run. The farm is generated from --seed. You can set:
+#   --sites, --pages per site, --fanout   links from each page to deeper pages
+#   --page-kb                             filler text per page
+#   --contact home|footer|deep|mixed      where the contact details are (deep: only on
+#                                         the deepest page, behind no "contact" link)
+#   --slow, --slow-latency                share of hosts answering slowly
+#   --flaky                               share of hosts answering 503 to every 3rd request
+#   --duplicates                          extra list entries re-listing a farm site under
+#                                         another URL, as Maps does for chains and branches
+# The server runs in its own process, so the CPU time and peak RSS reported are the
+# crawler's (plus its parse workers). --engine async runs the pipeline's crawl path
+# (SiteResultCache + AsyncCrawler, --concurrency crawl workers); --engine threads runs
+# crawl_and_aggregate on a thread pool. Results are saved with --output and compared
+# against an earlier file with --compare, which exits 1 when pages/sec or CPU time
+# per page got more than --tolerance worse.
+#
+# Usage: python benchmarks/site_farm_bench.py [--sites 40] [--pages 12] [--output run.json] [--compare baseline.json]
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scraper.config import DEFAULT_CONCURRENCY, DEFAULT_PARSE_WORKERS, DEFAULT_PER_HOST
+from scraper.crawl import AsyncCrawler, crawl_and_aggregate
+from scraper.http_pool import SessionPool
+from scraper.metrics import METRICS
+from scraper.rate_control import RateController
+from scraper.site_cache import SiteResultCache
+CONTACT_PLACEMENTS = ('home', 'footer', 'deep')
+FILLER_WORDS = ('quality', 'service', 'local', 'family', 'owned', 'since', 'trusted', 'team', 'offers', 'friendly',
+                'professional', 'affordable', 'customers', 'community', 'experience', 'years', 'open', 'daily')
+URL_VARIANTS = ('{}', '{}?utm_source=maps', '{}#contact', '{}index.html') # How duplicate entries re-list a site
+def filler(rng, size):
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(FILLER_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)
+def build_farm(args):
+    # One dict per site: its pages by path, scripted behaviour and the contacts a crawl should find
+    rng = random.Random(args.seed)
+    sites = []
+    for index in range(args.sites):
+        placement = rng.choice(CONTACT_PLACEMENTS) if args.contact == 'mixed' else args.contact
+        phone = f'(555) 200-{index:04d}'
+        email = f'info@business{index}.example'
+        contacts = f'<p>Call {phone} or <a href="mailto:{email}">email us</a>.</p>'
+        footer = '<footer><a href="/contact">Contact us</a></footer>' if placement == 'footer' else ''
+        pages = {}
+        for number in range(args.pages):
+            children = range(number * args.fanout + 1, min((number + 1) * args.fanout + 1, args.pages))
+            links = ''.join(f'<li><a href="/page-{child}">Section {child}</a></li>' for child in children)
+            here = contacts if (placement == 'home' and number == 0) or (placement == 'deep' and number == args.pages - 1) else ''
+            text = ''.join(f'<p>{filler(rng, 400)}</p>' for _ in range(max(1, args.page_kb * 1024 // 400)))
+            page = (f'<html><head><title>Business {index}</title></head><body><nav><a href="/">Home</a><ul>{links}</ul></nav>'
+                    f'<h1>Business {index} page {number}</h1>{here}{text}{footer}</body></html>')
+            pages['/' if number == 0 else f'/page-{number}'] = page.encode()
+        if placement == 'footer':
+            pages['/contact'] = f'<html><body><h1>Contact</h1>{contacts}</body></html>'.encode()
+        pages['/index.html'] = pages['/']
+        sites.append({'pages': pages, 'placement': placement, 'phone': phone, 'email': email, 'latency': args.latency,
+                      'flaky': False})
+    for site in rng.sample(sites, round(args.slow * args.sites)):
+        site['latency'] = args.slow_latency
+    for site in rng.sample(sites, round(args.flaky * args.sites)):
+        site['flaky'] = True
+    return sites
+def farm_entries(args, ports):
+    # (site index, url) for every list entry: each site once, plus the duplicates, in shuffled order
+    rng = random.Random(args.seed + 1)
+    entries = [(index, f'http://127.0.0.1:{port}/') for index, port in enumerate(ports)]
+    for _ in range(round(args.duplicates * args.sites)):
+        index = rng.randrange(args.sites)
+        entries.append((index, rng.choice(URL_VARIANTS).format(f'http://127.0.0.1:{ports[index]}/')))
+    rng.shuffle(entries)
+    return entries
+def serve_farm(args, conn):
+    # Runs in its own process: one listening socket per site, so every site is its own host.
+    # Sends the ports, serves until told to stop, then sends what it served.
+    from aiohttp import web
+    sites = build_farm(args)
+    served = {'pages': 0, 'robots': 0, 'not_found': 0, 'errors': 0}
+    requests = [0] * len(sites)
+    by_port = {}
+   
+    async def handle(request):
+        index = by_port[request.transport.get_extra_info('sockname')[1]]
+        site = sites[index]
+        requests[index] += 1
+        await asyncio.sleep(site['latency'])
+        if site['flaky'] and requests[index] % 3 == 0:
+            served['errors'] += 1
+            return web.Response(status=503, text='Try again later')
+        if request.path == '/robots.txt':
+            served['robots'] += 1
+            return web.Response(text='User-agent: *\nAllow: /\n')
+        body = site['pages'].get(request.path)
+        if body is None:
+            served['not_found'] += 1
+            return web.Response(status=404, text='Not found')
+        served['pages'] += 1
+        return web.Response(body=body, content_type='text/html', charset='utf-8')
+   
+    async def serve():
+        runner = web.AppRunner(web.Application())
+        runner.app.router.add_get('/{path:.*}', handle)
+        await runner.setup()
+        for index in range(len(sites)):
+            sock = socket.socket()
+            sock.bind(('127.0.0.1', 0))
+            by_port[sock.getsockname()[1]] = index
+            await web.SockSite(runner, sock).start()
+        conn.send(list(by_port))
+        await asyncio.get_running_loop().run_in_executor(None, conn.recv)
+        await runner.cleanup()
+        conn.send(served)
+    asyncio.run(serve())
+def quiet(message):
+    pass
+async def crawl_async(args, urls):
+    # The pipeline's crawl path: crawl workers taking list entries from a queue, through the site cache
+    site_cache = SiteResultCache()
+    queue = asyncio.Queue()
+    for entry in enumerate(urls):
+        queue.put_nowait(entry)
+    results = [None] * len(urls)
+    latencies = []
+    async with AsyncCrawler(args.max_depth, args.max_pages, True, quiet, concurrency=args.concurrency,
+                            per_host=DEFAULT_PER_HOST, delay=args.delay, parse_workers=args.parse_workers) as crawler:
+        async def crawl_worker():
+            while not queue.empty():
+                index, url = queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    results[index] = await site_cache.crawl(url, crawler.crawl)
+                except Exception as e:
+                    print(f"Error crawling {url}: {e}")
+                latencies.append(time.perf_counter() - started)
+        await asyncio.gather(*(crawl_worker() for _ in range(args.concurrency)))
+    summary = str(site_cache)
+    site_cache.close()
+    return results, latencies, summary
+def crawl_threads(args, urls):
+    pool = SessionPool()
+    latencies = []
+   
+    def crawl_one(url):
+        started = time.perf_counter()
+        try:
+            return crawl_and_aggregate(url, args.max_depth, args.max_pages, True, quiet, pool, rate=RateController(args.delay))
+        except Exception as e:
+            print(f"Error crawling {url}: {e}")
+        finally:
+            latencies.append(time.perf_counter() - started)
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(crawl_one, urls))
+    pool.close()
+    return results, latencies, f"{len(urls)} crawls, no site dedup"
+def quantile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))] if ordered else 0.0
+def peak_rss_mb(who):
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+def run(args):
+    farm = build_farm(args)
+    spawn = multiprocessing.get_context('spawn')
+    conn, server_conn = spawn.Pipe()
+    server = spawn.Process(target=serve_farm, args=(args, server_conn), daemon=True)
+    server.start()
+    try:
+        entries = farm_entries(args, conn.recv())
+        urls = [url for _, url in entries]
+        METRICS.reset()
+        cpu_before = os.times()
+        started = time.perf_counter()
+        if args.engine == 'async':
+            results, latencies, dedup = asyncio.run(crawl_async(args, urls))
+        else:
+            results, latencies, dedup = crawl_threads(args, urls)
+        elapsed = time.perf_counter() - started
+        cpu_after = os.times() # Parse workers have exited by now, so their CPU time counts as children
+        cpu_seconds = sum(after - before for after, before in zip(cpu_after[:4], cpu_before[:4]))
+        rss = peak_rss_mb(resource.RUSAGE_SELF) if resource else None # The crawler process
+        parse_rss = peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None # Largest exited child: the parse workers
+        conn.send('stop')
+        served = conn.recv()
+    finally:
+        server.join(timeout=10)
+        if server.is_alive():
+            server.kill()
+    by_contact = {placement: [0, 0] for placement in CONTACT_PLACEMENTS} # Entries with the right contacts, entries
+    for (index, _), result in zip(entries, results):
+        counts = by_contact[farm[index]['placement']]
+        counts[0] += bool(result and farm[index]['phone'] in result[2] and farm[index]['email'] in result[0])
+        counts[1] += 1
+    stages = {stage: {key: value for key, value in histogram.items() if key != 'hosts'}
+              for stage, histogram in METRICS.to_json()['stages'].items()}
+    return {
+        'benchmark': 'site_farm',
+        'engine': args.engine,
+        'farm': {name: getattr(args, name) for name in ('seed', 'sites', 'pages', 'fanout', 'page_kb', 'contact', 'latency',
+                                                       'slow', 'slow_latency', 'flaky', 'duplicates')},
+        'crawl': {name: getattr(args, name) for name in ('max_depth', 'max_pages', 'concurrency', 'delay', 'parse_workers')},
+        'environment': {'python': platform.python_version(), 'platform': platform.platform(), 'cpu_count': os.cpu_count(),
+                        'commit': git_commit()},
+        'results': {
+            'entries': len(urls),
+            'entries_correct': sum(correct for correct, _ in by_contact.values()),
+            'correct_by_contact': {placement: counts for placement, counts in by_contact.items() if counts[1]},
+            'pages': served['pages'],
+            'requests': sum(served.values()),
+            'errors_served': served['errors'],
+            'seconds': round(elapsed, 3),
+            'pages_per_sec': round(served['pages'] / elapsed, 2),
+            'site_p50': round(quantile(latencies, 0.5), 4),
+            'site_p99': round(quantile(latencies, 0.99), 4),
+            'cpu_seconds': round(cpu_seconds, 3),
+            'cpu_ms_per_page': round(cpu_seconds * 1000 / max(served['pages'], 1), 3),
+            'peak_rss_mb': rss,
+            'children_peak_rss_mb': parse_rss,
+            'dedup': dedup,
+        },
+        'stages': stages,
+    }
+def compare(current, baseline, tolerance):
+    # Prints the change of each result; returns the names of the ones that regressed beyond tolerance
+    if current['farm'] != baseline['farm'] or current['crawl'] != baseline['crawl'] or current['engine'] != baseline['engine']:
+        print("Warning: the baseline was run with a different farm, crawl settings or engine")
+    print(f"Compared with {baseline['environment'].get('commit') or 'baseline'}:")
+    regressed = []
+    for name, higher_is_better in (('pages_per_sec', True), ('cpu_ms_per_page', False), ('site_p50', False),
+                                   ('site_p99', False), ('peak_rss_mb', False), ('entries_correct', True)):
+        old, new = baseline['results'].get(name), current['results'].get(name)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        print(f"  {name:16s} {old:>10} -> {new:>10} ({change:+.1%})")
+        worse = -change if higher_is_better else change
+        if name in ('pages_per_sec', 'cpu_ms_per_page') and worse > tolerance:
+            regressed.append(name)
+        elif name == 'entries_correct' and new < old:
+            regressed.append(name)
+    return regressed
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end crawl benchmark on a synthetic website farm')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--sites', type=int, default=40)
+    parser.add_argument('--pages', type=int, default=12, help='pages per site')
+    parser.add_argument('--fanout', type=int, default=3, help='links from each page to deeper pages')
+    parser.add_argument('--page-kb', type=int, default=8, help='filler text per page (KiB)')
+    parser.add_argument('--contact', choices=CONTACT_PLACEMENTS + ('mixed',), default='mixed')
+    parser.add_argument('--latency', type=float, default=0.01, help='server time per response (s)')
+    parser.add_argument('--slow', type=float, default=0.1, help='share of hosts that are slow')
+    parser.add_argument('--slow-latency', type=float, default=0.3)
+    parser.add_argument('--flaky', type=float, default=0.1, help='share of hosts answering 503 to every 3rd request')
+    parser.add_argument('--duplicates', type=float, default=0.25, help='extra entries re-listing a site, as a share of --sites')
+    parser.add_argument('--engine', choices=('async', 'threads'), default='async')
+    parser.add_argument('--max-depth', type=int, default=3)
+    parser.add_argument('--max-pages', type=int, default=30)
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--delay', type=float, default=0.0, help='politeness delay per host (the crawler default is 0.5s)')
+    parser.add_argument('--parse-workers', type=int, default=DEFAULT_PARSE_WORKERS)
+    parser.add_argument('--output', help='save the results as JSON')
+    parser.add_argument('--compare', help='results JSON of an earlier run')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='allowed slowdown before --compare fails')
+    args = parser.parse_args()
+   
+    report = run(args)
+    results = report['results']
+    print(f"{args.engine}: {results['pages']} pages in {results['seconds']:.2f}s -> {results['pages_per_sec']:.1f} pages/sec; "
+          f"{results['entries_correct']}/{results['entries']} entries with the right contacts "
+          f"({', '.join(f'{placement} {found}/{total}' for placement, (found, total) in results['correct_by_contact'].items())})")
+    print(f"  per site p50 {results['site_p50'] * 1000:.0f}ms, p99 {results['site_p99'] * 1000:.0f}ms; "
+          f"CPU {results['cpu_seconds']:.2f}s ({results['cpu_ms_per_page']:.2f}ms/page); peak RSS {results['peak_rss_mb']} MiB "
+          f"(parse workers {results['children_peak_rss_mb']} MiB)")
+    print(f"  {results['requests']} requests, {results['errors_served']} x 503; {results['dedup']}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved to {args.output}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressed = compare(report, json.load(f), args.tolerance)
+        if regressed:
+            print(f"Regressed beyond {args.tolerance:.0%}: {', '.join(regressed)}")
+            sys.exit(1)
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+# IMPORTANT DISCLAIMER:
+# Scraping Google Maps is against Google's Terms of Service and may result in IP bans or legal issues.
+# Consider using the official Google Places API instead, which requires an API key.
+# This code is provided for educational purposes only. Use at your own risk.
+#
+# Features (2025 Optimized):
+# - Uses async Playwright for efficient Google Maps scraping.
+# - Crawls websites for emails, addresses, phones, and social media links.
+# - Headless pipeline API and command-line interface; the Tkinter GUI is a thin layer on top.
+# - Tkinter GUI with fields for search query, max results (1-200), crawl depth, max pages.
+# - Progress bar for visual feedback (Maps: 50%, websites: 50%).
+# - Non-headless mode and robots.txt checking options (per-URL rules, cached, Crawl-delay honoured).
+# - Optional on-disk page cache with conditional revalidation for repeat runs.
+# - Save/load config.
+# - Asyncio website crawler with global and per-host concurrency caps.
+# - Robust error handling with retries and user agent rotation.
+# - Streaming export: choose the output (CSV, JSON Lines or Parquet) up front; records are written as they
+#   finish and re-running into the same file resumes it (defaults to output.csv if not chosen).
+#
+# Prerequisites:
+# 1. Install Python 3.8+[](https://www.python.org/downloads/)
+# 2. Install packages: pip install playwright requests aiohttp
+#    Optional: pip install selectolax (or lxml) for faster page parsing, brotli for br compression,
+#    pyarrow for Parquet output
+# 3. Run: playwright install # Downloads Chromium browser bundle.
+#
+# Usage:
+#   python -m scraper "cafes in Tokyo" -o cafes.csv   # headless
+#   python -m scraper -q queries.txt -o leads.csv      # batch: one browser, shared crawl queue
+#   python -m scraper --gui                           # Tkinter GUI
+#
+#   from scraper import ScrapeConfig, run_pipeline
+#   async for record in run_pipeline(ScrapeConfig(query="cafes in Tokyo")): ...
+#
+# Heavy dependencies (Playwright, aiohttp, requests, parser backends, Tkinter) are only
+# imported when the stage that needs them runs.
+from .config import ScrapeConfig
+from .pipeline import run_job, run_pipeline
+__all__ = ['ScrapeConfig', 'run_job', 'run_pipeline']
@@ -0,0 +1,4 @@
+import sys
+from .cli import main
+if __name__ == '__main__': # Parse worker processes re-import this module
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# Command-line entry point: python -m scraper "cafes in Tokyo" -o cafes.csv
+import argparse
+import asyncio
+import json
+import sys
+from .config import ScrapeConfig
+from .maps import MAPS_DETAIL_MODES, MapsWaits
+from .pipeline import read_queries, run_job
+from .task_queue import TASK_QUEUE_FILE, SqliteTaskQueue
+from .worker import run_worker
+def maps_waits(spec):
+    try:
+        MapsWaits.parse(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return spec
+def build_parser():
+    parser = argparse.ArgumentParser(prog='scraper', description='Scrape Google Maps businesses and crawl their websites for contacts.')
+    parser.add_argument('query', nargs='?', help='search query, e.g. "restaurants in New York"')
+    parser.add_argument('-q', '--queries-file', help='file with one query per line, run as one batch with a shared browser')
+    parser.add_argument('-o', '--output', help='output file (.csv, .jsonl or .parquet); an existing file is resumed')
+    parser.add_argument('-n', '--max-results', type=int, help='max Google Maps results (up to 200)')
+    parser.add_argument('--max-depth', type=int, help='max crawl depth per website')
+    parser.add_argument('--max-pages', type=int, help='max pages per website')
+    parser.add_argument('--concurrency', type=int, help='max concurrent website fetches')
+    parser.add_argument('--per-host', type=int, help='max concurrent fetches to one host')
+    parser.add_argument('--parse-workers', type=int, help='processes parsing pages (default: one per CPU core, or 0 on a single core: parse on a thread)')
+    parser.add_argument('--maps-detail', choices=MAPS_DETAIL_MODES,
+                        help="open each place only when its listing card is 'missing' the name, website or street address (default), "
+                             "'always' (full address and owner name, slower), or 'never'")
+    parser.add_argument('--maps-waits', type=maps_waits, metavar='NAME=MS,...',
+                        help='longest waits for Maps to be ready, e.g. results=20000,scroll=5000 on a slow connection '
+                             '(results, consent, scroll, idle_scrolls, detail, back)')
+    parser.add_argument('--non-headless', action='store_const', const=True, help='show the browser window')
+    parser.add_argument('--no-robots', dest='check_robots', action='store_const', const=False, help='skip robots.txt checks')
+    parser.add_argument('--page-cache', action='store_const', const=True, help='cache pages between runs')
+    parser.add_argument('--robots-cache', metavar='FILE', help='keep fetched robots.txt files in this JSON file between runs')
+    parser.add_argument('--site-cache', metavar='FILE', help='reuse website results kept in this SQLite file by runs in the last 24h')
+    parser.add_argument('--metrics', dest='metrics_file', help='write per-stage metrics at the end (.prom Prometheus textfile, otherwise JSON)')
+    parser.add_argument('--profile', help='profile the run into this file (.html needs pyinstrument, otherwise cProfile stats)')
+    parser.add_argument('--task-queue', help='queue websites in this SQLite file for --worker processes to crawl')
+    parser.add_argument('--queue-depth', type=int, help='with --task-queue, max websites queued for the workers at once (default 500)')
+    parser.add_argument('--worker', action='store_true', help=f'crawl websites queued by jobs in --task-queue (default {TASK_QUEUE_FILE}) instead of running a job')
+    parser.add_argument('--idle-exit', type=float, help='with --worker, exit after this many seconds without tasks')
+    parser.add_argument('--config', help='JSON config saved from the GUI or written by hand')
+    parser.add_argument('--gui', action='store_true', help='open the Tkinter GUI instead')
+    return parser
+def config_from_args(args):
+    # The --config file (if any), overridden by every option given on the command line
+    config = ScrapeConfig()
+    if args.config:
+        with open(args.config, 'r') as f:
+            config = ScrapeConfig.from_dict(json.load(f))
+    for name, value in vars(args).items():
+        if value is not None and hasattr(config, name):
+            setattr(config, name, value)
+    return config
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.gui:
+        from .gui import main as gui_main
+        return gui_main()
+   
+    config = config_from_args(args)
+    if args.worker:
+        queue = SqliteTaskQueue(config.task_queue or TASK_QUEUE_FILE)
+        try:
+            asyncio.run(run_worker(config, queue, log, idle_exit=args.idle_exit))
+        except KeyboardInterrupt:
+            log("Worker interrupted; its unfinished tasks go back to the queue when their leases expire")
+            return 130
+        finally:
+            queue.close()
+        return 0
+    queries = read_queries(args.queries_file) if args.queries_file else None
+    if not config.query and not queries:
+        parser.error("a search query or --queries-file is required (or use --gui)")
+   
+    try:
+        asyncio.run(run_job(config, log, queries=queries))
+    except KeyboardInterrupt:
+        log(f"Interrupted; records written so far are in {config.output} and will be skipped on the next run")
+        return 130
+    return 0
@@ -0,0 +1,56 @@
+# Job settings shared by the pipeline, the CLI and the GUI.
+import os
+from dataclasses import dataclass, fields
+DEFAULT_RESULTS = 10 # Default number of results
+DEFAULT_OUTPUT = 'output.csv' # Default output file if not chosen
+DEFAULT_DEPTH = 2 # Default crawl depth
+DEFAULT_MAX_PAGES = 30 # Default max pages per website
+DEFAULT_CONCURRENCY = 50 # Max concurrent website fetches across all hosts
+DEFAULT_PER_HOST = 2 # Max concurrent fetches to a single host
+POLITENESS_DELAY = 0.5 # Seconds between fetch starts to the same host
+def default_parse_workers(cpus):
+    # A process per core; on a single core the pool would only compete with the event loop
+    return cpus if cpus and cpus > 1 else 0
+DEFAULT_PARSE_WORKERS = default_parse_workers(os.cpu_count()) # Processes parsing fetched pages; 0 parses on a thread instead
+PARSE_BACKLOG = 4 # Fetched pages waiting per parse worker before fetchers pause
+CRAWL_QUEUE_SIZE = 100 # Scraped records waiting for a website crawl before Maps scraping pauses
+DEFAULT_QUEUE_DEPTH = 500 # Websites a --task-queue job keeps queued or leased for its workers at once
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36'
+]
+@dataclass
+class ScrapeConfig:
+    query: str = ''
+    max_results: int = DEFAULT_RESULTS
+    max_depth: int = DEFAULT_DEPTH
+    max_pages: int = DEFAULT_MAX_PAGES
+    non_headless: bool = False
+    check_robots: bool = True
+    page_cache: bool = False
+    robots_cache: str = '' # JSON file keeping fetched robots.txt between runs; empty keeps them in memory
+    site_cache: str = '' # SQLite file keeping website results between runs (24h); empty keeps them for this run only
+    output: str = DEFAULT_OUTPUT
+    concurrency: int = DEFAULT_CONCURRENCY
+    per_host: int = DEFAULT_PER_HOST
+    parse_workers: int = DEFAULT_PARSE_WORKERS
+    maps_detail: str = 'missing' # 'always', 'missing' or 'never' open a place beyond its listing card
+    maps_waits: str = '' # Maps readiness wait limits to change, e.g. 'results=20000,scroll=5000' (ms)
+    metrics_file: str = '' # Per-stage metrics written at the end of a job (.prom textfile, else JSON)
+    profile: str = '' # Profile of the job's event loop (.html with pyinstrument, else cProfile stats)
+    task_queue: str = '' # Queue file whose `--worker` processes crawl the websites; empty crawls in-process
+    queue_depth: int = DEFAULT_QUEUE_DEPTH # With task_queue: websites handed to the workers at once (concurrency is per worker)
+   
+    @classmethod
+    def from_dict(cls, values):
+        # Accepts saved GUI/CLI config JSON; unknown keys are ignored and numbers may be strings
+        config = cls()
+        for field in fields(cls):
+            if field.name in values and values[field.name] not in (None, ''):
+                value = values[field.name]
+                setattr(config, field.name, field.type(value) if field.type in (int, str) else bool(int(value)))
+        return config
+   
+    def to_dict(self):
+        return {field.name: getattr(self, field.name) for field in fields(self)}
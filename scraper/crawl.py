@@ -0,0 +1,341 @@
+# Website crawlers: the threaded crawl_and_aggregate and the asyncio AsyncCrawler.
+import asyncio
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count
+from urllib.parse import urlparse
+from .config import DEFAULT_CONCURRENCY, DEFAULT_PER_HOST, PARSE_BACKLOG, POLITENESS_DELAY, USER_AGENTS
+from .extract import decode_body, parse_page
+from .frontier import SiteCrawl
+from .http_pool import ACCEPT_ENCODING, HTTP_POOL, POOL_IDLE_TIMEOUT, ConnectionStats
+from .metrics import METRICS
+from .rate_control import RETRY_STATUSES, RateController
+from .robots import ROBOTS_CACHE, RobotsCache, fetch_robots_txt
+def get_with_retries(url, headers, pool=HTTP_POOL, rate=None):
+    # pool.get paced by the rate controller, retrying transient failures while its budget lasts
+    import requests
+    host = urlparse(url).netloc
+    for attempt in count():
+        if rate:
+            with METRICS.timer('http.rate_wait', host):
+                time.sleep(rate.reserve(host))
+        try:
+            with METRICS.timer('http.fetch', host):
+                response = pool.get(url, headers=headers, timeout=5)
+            METRICS.count(f'http.{response.status_code}', host=host)
+        except (requests.ConnectionError, requests.Timeout):
+            METRICS.count('http.errors', host=host)
+            if not rate:
+                raise
+            rate.record(host, None)
+            backoff = rate.retry_delay(host, attempt)
+            if backoff is None:
+                raise
+        else:
+            if not rate:
+                return response
+            rate.record(host, response.status_code, response.headers.get('Retry-After'))
+            backoff = rate.retry_delay(host, attempt) if response.status_code in RETRY_STATUSES else None
+            if backoff is None:
+                return response
+        time.sleep(backoff)
+def fetch_page(url, headers, pool=HTTP_POOL, page_cache=None, rate=None):
+    # Returns (html, fetched); fetched is False when the page came straight from the cache
+    if page_cache is None:
+        response = get_with_retries(url, headers, pool, rate)
+        response.raise_for_status()
+        return response.text, True
+    cached = page_cache.lookup(url)
+    if page_cache.is_fresh(cached):
+        return page_cache.serve_fresh(url, cached), False
+    response = get_with_retries(url, dict(headers, **page_cache.conditional_headers(cached)), pool, rate)
+    if response.status_code != 304:
+        response.raise_for_status()
+    return page_cache.record(url, response.status_code, response.headers, response.text, cached), True
+def aggregate_results(emails, addresses, phones, social_media):
+    agg_email = '; '.join(sorted(emails)) if emails else 'Not found'
+    agg_address = '; '.join(sorted(addresses)) if addresses else 'Not found'
+    agg_phone = '; '.join(sorted(phones)) if phones else 'Not found'
+    agg_social = '; '.join(sorted(social_media)) if social_media else 'Not found'
+    return [agg_email, agg_address, agg_phone, agg_social]
+def found_anything(result):
+    # False for skipped sites and for crawls that found nothing, including those where no page could be fetched
+    emails, addresses, phones, social_media = result
+    return '@' in emails or any(value != 'Not found' for value in (addresses, phones, social_media))
+def skipped_result(start_url):
+    if start_url:
+        METRICS.count('robots.disallowed', host=urlparse(start_url).netloc)
+    return ['Robots.txt disallows scraping' if start_url else 'No website', 'Not found', 'Not found', 'Not found']
+def record_parse(page, host):
+    # Moves the parse worker's timings into the job metrics
+    for stage, seconds in page.pop('timings', {}).items():
+        METRICS.observe(stage, seconds, host)
+    return page
+def finish_site(site, start_url, started, update_callback):
+    host = urlparse(start_url).netloc
+    METRICS.observe('crawl.site', time.perf_counter() - started, host)
+    METRICS.count('crawl.pages', site.pages_visited, host)
+    if site.stop_reason:
+        METRICS.count('crawl.early_stops', host=host)
+        update_callback(f"Stopped crawling {start_url} after {site.pages_visited} pages: {site.stop_reason}")
+    return aggregate_results(**site.found)
+def crawl_and_aggregate(start_url, max_depth, max_pages, check_robots, update_callback, pool=HTTP_POOL, robots=ROBOTS_CACHE,
+                        page_cache=None, rate=None):
+    if not start_url:
+        return skipped_result(start_url)
+    started = time.perf_counter()
+    rules = None
+    if check_robots:
+        rules = robots.rules_for(start_url, lambda robots_url: fetch_robots_txt(robots_url, pool))
+        if not rules.allowed(start_url):
+            return skipped_result(start_url)
+    rate = rate or RateController(POLITENESS_DELAY, update_callback)
+    if rules and rules.crawl_delay:
+        rate.set_crawl_delay(urlparse(start_url).netloc, rules.crawl_delay)
+   
+    site = SiteCrawl(start_url, max_depth, max_pages, rules)
+    headers = {'User-Agent': random.choice(USER_AGENTS)}
+   
+    while True:
+        next_page = site.next_url()
+        if next_page is None:
+            break
+        url, depth = next_page
+       
+        update_callback(f"Visiting website page: {url} ({site.pages_visited}/{max_pages})")
+       
+        try:
+            html, _ = fetch_page(url, headers, pool, page_cache, rate)
+            site.add_page(record_parse(parse_page(html, url), urlparse(url).netloc), depth)
+       
+        except Exception as e:
+            print(f"Error crawling {url}: {e}")
+            METRICS.count('crawl.errors', host=urlparse(url).netloc)
+            site.add_failure()
+   
+    return finish_site(site, start_url, started, update_callback)
+class AsyncCrawler:
+    # Asyncio crawl engine: one event loop drives every website at once. A global
+    # semaphore caps in-flight fetches, a per-host semaphore caps fetches to one host,
+    # and the rate controller paces each host separately so waiting on one host never
+    # stalls another. Parsing runs in a pool of parse_workers processes (or the loop's
+    # thread pool when 0), fed raw response bytes.
+    def __init__(self, max_depth, max_pages, check_robots, update_callback,
+                 concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                 delay=POLITENESS_DELAY, timeout=5, parse_executor=None, stats=None, robots=ROBOTS_CACHE,
+                 page_cache=None, rate=None, parse_workers=0):
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.check_robots = check_robots
+        self.update_callback = update_callback
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.delay = delay
+        self.timeout = timeout
+        self.parse_executor = parse_executor # None -> parse_workers processes, or the loop's thread pool
+        self.parse_workers = parse_workers
+        self.stats = stats or ConnectionStats()
+        self.robots = robots
+        self.page_cache = page_cache
+        self.rate = rate or RateController(delay, update_callback) # delay is each host's starting pace
+        self.session = None
+        self._global_limit = None
+        self._host_limits = {}
+        self._transient_errors = ()
+        self._parse_slots = None
+        self._own_executor = False
+        self._robots_pending = {}
+   
+    async def __aenter__(self):
+        import aiohttp
+        self._global_limit = asyncio.Semaphore(self.concurrency)
+        self._transient_errors = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+        if self.parse_executor is None and self.parse_workers > 0:
+            # spawn, not fork: the job process already runs browser and event-loop threads
+            self.parse_executor = ProcessPoolExecutor(self.parse_workers, mp_context=multiprocessing.get_context('spawn'))
+            self._own_executor = True
+        self._parse_slots = asyncio.Semaphore(max(self.parse_workers, 1) * PARSE_BACKLOG)
+        # Kept-alive connections are shared by all pages of a host and closed when idle
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host,
+                                         keepalive_timeout=POOL_IDLE_TIMEOUT)
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._on_request_start)
+        trace.on_dns_resolvehost_start.append(self._on_dns_start)
+        trace.on_dns_resolvehost_end.append(self._on_dns_resolved)
+        trace.on_connection_create_start.append(self._on_connection_start)
+        trace.on_connection_create_end.append(self._on_connection_created)
+        self.session = aiohttp.ClientSession(connector=connector, trace_configs=[trace],
+                                             headers={'Accept-Encoding': ACCEPT_ENCODING},
+                                             timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self
+   
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+        if self._own_executor:
+            self.parse_executor.shutdown(cancel_futures=True)
+            self.parse_executor = None
+            self._own_executor = False
+   
+    async def _on_request_start(self, session, context, params):
+        self.stats.record_request()
+        context.host = params.url.raw_authority
+   
+    async def _on_dns_start(self, session, context, params):
+        context.dns_started = time.perf_counter()
+   
+    async def _on_dns_resolved(self, session, context, params):
+        METRICS.observe('http.dns', time.perf_counter() - context.dns_started, context.host)
+   
+    async def _on_connection_start(self, session, context, params):
+        context.connect_started = time.perf_counter()
+   
+    async def _on_connection_created(self, session, context, params):
+        # Includes DNS resolution for new hosts
+        self.stats.record_connection()
+        METRICS.observe('http.connect', time.perf_counter() - context.connect_started, context.host)
+   
+    async def _wait_for_host_slot(self, host):
+        wait = self.rate.reserve(host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+   
+    async def fetch(self, url, headers, check_status=True):
+        # Transient failures (429/5xx, connection errors, timeouts) are retried with
+        # backoff while the host's retry budget lasts
+        host = urlparse(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        for attempt in count():
+            with METRICS.timer('http.rate_wait', host):
+                await self._wait_for_host_slot(host)
+            try:
+                waited = time.perf_counter()
+                async with self._host_limits[host], self._global_limit:
+                    started = time.perf_counter()
+                    METRICS.observe('http.slot_wait', started - waited, host)
+                    async with self.session.get(url, headers=headers) as response:
+                        METRICS.observe('http.response', time.perf_counter() - started, host)
+                        METRICS.count(f'http.{response.status}', host=host)
+                        self.rate.record(host, response.status, response.headers.get('Retry-After'))
+                        backoff = self.rate.retry_delay(host, attempt) if response.status in RETRY_STATUSES else None
+                        if backoff is None:
+                            if check_status and response.status != 304:
+                                response.raise_for_status()
+                            with METRICS.timer('http.download', host):
+                                body = await response.read()
+                            return response.status, body, response.headers
+            except self._transient_errors:
+                METRICS.count('http.errors', host=host)
+                self.rate.record(host, None)
+                backoff = self.rate.retry_delay(host, attempt)
+                if backoff is None:
+                    raise
+            await asyncio.sleep(backoff)
+   
+    async def fetch_page(self, url, headers):
+        # Returns (body, content type): raw bytes from the network, text from the page cache.
+        # Fresh cached pages skip the network (and the host's rate limit) entirely.
+        if self.page_cache is None:
+            _, body, response_headers = await self.fetch(url, headers)
+            return body, response_headers.get('Content-Type')
+        cached = self.page_cache.lookup(url)
+        if self.page_cache.is_fresh(cached):
+            return self.page_cache.serve_fresh(url, cached), None
+        request_headers = dict(headers, **self.page_cache.conditional_headers(cached))
+        status, body, response_headers = await self.fetch(url, request_headers)
+        text = decode_body(body, response_headers.get('Content-Type'))
+        return self.page_cache.record(url, status, response_headers, text, cached), None
+   
+    async def parse(self, body, url, content_type=None):
+        # A fetched page waits here for a parse slot, so fetchers stall rather than
+        # piling up pages faster than the parse workers can take them
+        started = time.perf_counter()
+        async with self._parse_slots:
+            page = await asyncio.get_running_loop().run_in_executor(self.parse_executor, parse_page, body, url, content_type)
+        # Whatever the worker did not spend parsing was spent waiting for a slot or in transit
+        host = urlparse(url).netloc
+        METRICS.observe('parse.queue', time.perf_counter() - started - sum(page['timings'].values()), host)
+        return record_parse(page, host)
+   
+    async def robots_rules(self, url):
+        origin = RobotsCache.origin(url)
+        rules = self.robots.lookup(origin)
+        if rules is not None:
+            return rules
+        # Sites sharing a host wait on a single robots.txt fetch
+        if origin not in self._robots_pending:
+            self._robots_pending[origin] = asyncio.ensure_future(self._fetch_robots(origin))
+        try:
+            return await asyncio.shield(self._robots_pending[origin])
+        finally:
+            self._robots_pending.pop(origin, None)
+   
+    async def _fetch_robots(self, origin):
+        try:
+            with METRICS.timer('robots.fetch', urlparse(origin).netloc):
+                status, body, headers = await self.fetch(origin + '/robots.txt', {}, check_status=False)
+            text = decode_body(body, headers.get('Content-Type'))
+        except Exception:
+            status, text = None, ''
+        return self.robots.store(origin, status, text)
+   
+    async def crawl(self, start_url, max_depth=None, max_pages=None, check_robots=None):
+        # The limits default to the crawler's own; a worker passes the ones of the job it serves
+        if not start_url:
+            return skipped_result(start_url)
+        max_depth = self.max_depth if max_depth is None else max_depth
+        max_pages = self.max_pages if max_pages is None else max_pages
+        started = time.perf_counter()
+        rules = None
+        if self.check_robots if check_robots is None else check_robots:
+            rules = await self.robots_rules(start_url)
+            if not rules.allowed(start_url):
+                return skipped_result(start_url)
+        if rules and rules.crawl_delay:
+            self.rate.set_crawl_delay(urlparse(start_url).netloc, rules.crawl_delay)
+       
+        site = SiteCrawl(start_url, max_depth, max_pages, rules)
+        headers = {'User-Agent': random.choice(USER_AGENTS)}
+       
+        while True:
+            next_page = site.next_url()
+            if next_page is None:
+                break
+            url, depth = next_page
+           
+            self.update_callback(f"Visiting website page: {url} ({site.pages_visited}/{max_pages})")
+           
+            try:
+                body, content_type = await self.fetch_page(url, headers)
+                # Parsing is CPU-bound; keep it off the event loop
+                page = await self.parse(body, url, content_type)
+            except Exception as e:
+                print(f"Error crawling {url}: {e}")
+                METRICS.count('crawl.errors', host=urlparse(url).netloc)
+                site.add_failure()
+                continue
+           
+            site.add_page(page, depth)
+       
+        return finish_site(site, start_url, started, self.update_callback)
+   
+    async def crawl_many(self, start_urls, result_callback=None):
+        # Crawl every site concurrently; result_callback(index, result) fires as each finishes
+        results = [None] * len(start_urls)
+       
+        async def crawl_one(index, url):
+            try:
+                results[index] = await self.crawl(url)
+            except Exception as e:
+                print(f"Error crawling {url}: {e}")
+                results[index] = aggregate_results(set(), set(), set(), set())
+            if result_callback:
+                result_callback(index, results[index])
+       
+        await asyncio.gather(*(crawl_one(i, url) for i, url in enumerate(start_urls)))
+        return results
+async def crawl_websites_async(start_urls, max_depth, max_pages, check_robots, update_callback, result_callback=None, **options):
+    async with AsyncCrawler(max_depth, max_pages, check_robots, update_callback, **options) as crawler:
+        return await crawler.crawl_many(start_urls, result_callback)
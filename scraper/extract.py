@@ -0,0 +1,174 @@
+# Single-pass contact extraction from HTML pages.
+import re
+import time
+from functools import lru_cache
+from html.parser import HTMLParser
+from importlib.util import find_spec
+from urllib.parse import urljoin
+PARSER_BACKEND = 'auto' # 'auto', 'selectolax', 'lxml' or 'stdlib'
+NON_TEXT_TAGS = {'script', 'style', 'template'} # Contents never counted as page text
+# Email regex (RFC 5322-compliant, case-insensitive)
+EMAIL_REGEX = re.compile(r'[a-z0-9!#$%&\'*+/=?^_`{|}~-]+(?:\.[a-z0-9!#$%&\'*+/=?^_`{|}~-]+)*@(?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+[a-z]{2,}', re.IGNORECASE)
+# Address regex (international support)
+ADDRESS_REGEX = re.compile(r'\b\d{1,5}\s+[\w\s.-]+(?:St|Street|Ave|Avenue|Rd|Road|Blvd|Boulevard|Ln|Lane|Strasse|Rue|Av|Plaza)?,\s+[\w\s.-]+,\s+[A-Z]{2,}\s+[A-Z0-9- ]+\b', re.IGNORECASE)
+# Phone regex (US/international)
+PHONE_REGEX = re.compile(r'\b(?:\+?(\d{1,3}))?[-.\s]?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b')
+# Social media regex
+SOCIAL_REGEX = re.compile(r'^(https?://(?:www\.)?(facebook|x|twitter|instagram|linkedin)\.com/[\w\-/]+)', re.IGNORECASE)
+class _PageScanner(HTMLParser):
+    # Streaming single pass over a document: collects the visible text (what
+    # BeautifulSoup's get_text returns) and every <a href> value in document order,
+    # noting which of them sit inside a <footer>.
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.text = []
+        self.hrefs = []
+        self.footer_hrefs = []
+        self._skip_depth = 0
+        self._footer_depth = 0
+   
+    def handle_starttag(self, tag, attrs):
+        if tag in NON_TEXT_TAGS:
+            self._skip_depth += 1
+        elif tag == 'footer':
+            self._footer_depth += 1
+        elif tag == 'a':
+            for name, value in attrs:
+                if name == 'href':
+                    self.hrefs.append(value or '')
+                    if self._footer_depth:
+                        self.footer_hrefs.append(value or '')
+                    break
+   
+    def handle_endtag(self, tag):
+        if tag in NON_TEXT_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == 'footer' and self._footer_depth:
+            self._footer_depth -= 1
+   
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.text.append(data)
+def _scan_stdlib(html):
+    scanner = _PageScanner()
+    scanner.feed(html)
+    scanner.close()
+    return ' '.join(scanner.text), scanner.hrefs, scanner.footer_hrefs
+def _scan_lxml(html):
+    from lxml import etree, html as lxml_html
+    text = []
+    hrefs = []
+    footer_hrefs = []
+    skip_depth = 0
+    footer_depth = 0
+    for event, element in etree.iterwalk(lxml_html.fromstring(html), events=('start', 'end')):
+        tag = element.tag if isinstance(element.tag, str) else None # None for comments/PIs
+        if event == 'start':
+            if tag in NON_TEXT_TAGS:
+                skip_depth += 1
+            elif tag == 'footer':
+                footer_depth += 1
+            elif tag == 'a' and 'href' in element.attrib:
+                hrefs.append(element.get('href'))
+                if footer_depth:
+                    footer_hrefs.append(element.get('href'))
+            if tag and not skip_depth and element.text:
+                text.append(element.text)
+        else:
+            if tag in NON_TEXT_TAGS:
+                skip_depth -= 1
+            elif tag == 'footer':
+                footer_depth -= 1
+            if not skip_depth and element.tail:
+                text.append(element.tail)
+    return ' '.join(text), hrefs, footer_hrefs
+def _scan_selectolax(html):
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+    text = []
+    hrefs = []
+    footer_hrefs = []
+    root = SelectolaxParser(html).root
+    if root is not None:
+        for node in root.traverse(include_text=True):
+            if node.tag == '-text':
+                if node.parent is None or node.parent.tag not in NON_TEXT_TAGS:
+                    text.append(node.text_content)
+            elif node.tag == 'a' and 'href' in node.attributes:
+                href = node.attributes['href'] or ''
+                hrefs.append(href)
+                parent = node.parent
+                while parent is not None and parent.tag != 'footer':
+                    parent = parent.parent
+                if parent is not None:
+                    footer_hrefs.append(href)
+    return ' '.join(text), hrefs, footer_hrefs
+SCANNERS = {'selectolax': _scan_selectolax, 'lxml': _scan_lxml, 'stdlib': _scan_stdlib}
+@lru_cache(maxsize=None)
+def available_backends():
+    # Optional backends are only imported on first use, so just check they're installed
+    return tuple(name for name in SCANNERS if name == 'stdlib' or find_spec(name))
+def scan_document(html, backend=None):
+    # Returns (visible text, hrefs, hrefs inside <footer>) using the fastest installed backend
+    backend = backend or PARSER_BACKEND
+    if backend == 'auto':
+        backend = available_backends()[0]
+    try:
+        return SCANNERS[backend](html)
+    except Exception:
+        if backend == 'stdlib':
+            raise
+        return _scan_stdlib(html) # e.g. lxml rejects documents with an encoding declaration
+def decode_body(body, content_type=None):
+    # Response bytes to text, using the Content-Type charset (UTF-8 if absent or unknown)
+    charset = 'utf-8'
+    if content_type and 'charset=' in content_type:
+        charset = content_type.split('charset=', 1)[1].split(';', 1)[0].strip(' "\'')
+    try:
+        return body.decode(charset, errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+def parse_page(body, page_url, content_type=None, backend=None):
+    # Parse worker entry point: raw response bytes (or cached text) in, extract_page's
+    # result out, plus 'timings' (seconds spent decoding+scanning and in the regexes)
+    started = time.perf_counter()
+    html = decode_body(body, content_type) if isinstance(body, bytes) else body
+    scanned = scan_document(html, backend)
+    scanned_at = time.perf_counter()
+    page = extract_contacts(scanned, page_url)
+    page['timings'] = {'parse.scan': scanned_at - started, 'parse.extract': time.perf_counter() - scanned_at}
+    return page
+def extract_page(html, page_url, backend=None):
+    # Shared by the threaded and asyncio crawlers: one pass over the document, then
+    # returns the contact sets found on the page plus the absolute URLs it links to.
+    return extract_contacts(scan_document(html, backend), page_url)
+def extract_contacts(scanned, page_url):
+    text_content, hrefs, footer_hrefs = scanned
+   
+    page_emails = set(EMAIL_REGEX.findall(text_content)) if '@' in text_content else set()
+    page_addresses = set(m.group(0).strip() for m in ADDRESS_REGEX.finditer(text_content))
+    page_phones = set(m.group(0).strip() for m in PHONE_REGEX.finditer(text_content))
+    page_social = set()
+    links = []
+   
+    for href in hrefs:
+        scheme = href[:7].lower()
+        if scheme == 'mailto:':
+            email = href[7:].split('?')[0].strip()
+            if email:
+                page_emails.add(email)
+        elif scheme.startswith('tel:'):
+            phone = href[4:].strip()
+            if phone:
+                page_phones.add(phone)
+        elif SOCIAL_REGEX.match(href):
+            page_social.add(href)
+        links.append(urljoin(page_url, href))
+   
+    return {
+        'emails': page_emails,
+        'addresses': page_addresses,
+        'phones': page_phones,
+        'social_media': page_social,
+        'links': links,
+        'footer_links': [urljoin(page_url, href) for href in footer_hrefs]
+    }
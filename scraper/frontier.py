@@ -0,0 +1,139 @@
+# Crawl frontier: which page of a business website to fetch next, and when to stop.
+import heapq
+import re
+from itertools import count
+from urllib.parse import parse_qsl, urldefrag, urlencode, urlsplit, urlunsplit
+CRAWL_TARGET_FIELDS = ('emails', 'phones') # Stop once these are found and no contact page is left
+CRAWL_STALE_PAGES = 5 # Once something is found, stop after this many pages in a row add nothing new
+TRACKING_PARAMS = {'gclid', 'fbclid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid', '_ga', 'ref'} # Plus any utm_*
+SKIP_EXTENSIONS = {'pdf', 'jpg', 'jpeg', 'png', 'gif', 'webp', 'svg', 'ico', 'zip', 'gz', 'mp3', 'mp4', 'mov',
+                   'avi', 'doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx', 'css', 'js', 'json', 'xml', 'ics'}
+# A whole path segment naming a contact page, optionally with a suffix (contact-us, about_us, contact.html)
+CONTACT_PATH_REGEX = re.compile(r'(?:^|/)(?:contact|kontakt|about|impressum|imprint|ueber-uns|uber-uns|team|our-team|legal|legal-notice)'
+                                r'(?:[-_]?(?:us|me|form|page|info))?(?:\.\w+)?(?:/|$)', re.IGNORECASE)
+ARCHIVE_PATH_REGEX = re.compile(r'/(?:blog|news|tags?|categor(?:y|ies)|archives?|author|page|feed)/|/\d{4}/\d{1,2}/', re.IGNORECASE)
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+START_PRIORITY = -1
+CONTACT_PRIORITY = 0
+FOOTER_PRIORITY = 1
+PAGE_PRIORITY = 2 # Plus the link depth
+ARCHIVE_PRIORITY = 10 # Plus the link depth
+def normalize_url(url):
+    # Canonical form used for dedup: lowercase scheme/host, no default port, no
+    # fragment, no tracking parameters, sorted query, no trailing slash. None if unusable.
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    if port and port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+    path = parts.path.rstrip('/') or '/'
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k.lower() not in TRACKING_PARAMS and not k.lower().startswith('utm_')]
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ''))
+def site_key(url):
+    # Normalized host (and non-default port) of a URL; www.example.com and
+    # example.com are the same business website
+    key = normalize_url(url)
+    host = urlsplit(key).netloc if key else ''
+    return host[4:] if host.startswith('www.') else host
+def url_priority(url, depth, footer=False):
+    path = urlsplit(url).path
+    if CONTACT_PATH_REGEX.search(path):
+        return CONTACT_PRIORITY
+    if footer:
+        return FOOTER_PRIORITY
+    if ARCHIVE_PATH_REGEX.search(path + '/'):
+        return ARCHIVE_PRIORITY + depth
+    return PAGE_PRIORITY + depth
+class Frontier:
+    # Priority queue of same-site URLs, deduplicated on their normalized form when
+    # they are added. Likely contact pages come first; archives and files come last or never.
+    def __init__(self, start_url, max_depth):
+        self.max_depth = max_depth
+        self.site = site_key(start_url)
+        self._seen = set()
+        self._heap = []
+        self._order = count() # FIFO among equal priorities
+        self.add(start_url, 0, priority=START_PRIORITY)
+   
+    def __len__(self):
+        return len(self._heap)
+   
+    def add(self, url, depth, footer=False, priority=None):
+        if depth > self.max_depth:
+            return False
+        key = normalize_url(url)
+        if key is None or key in self._seen or site_key(key) != self.site:
+            return False
+        last_segment = urlsplit(key).path.rsplit('/', 1)[-1]
+        if '.' in last_segment and last_segment.rsplit('.', 1)[-1].lower() in SKIP_EXTENSIONS:
+            return False
+        self._seen.add(key)
+        if priority is None:
+            priority = url_priority(key, depth, footer)
+        # Fetch the URL as linked (minus the fragment); the normalized key is only for dedup
+        heapq.heappush(self._heap, (priority, next(self._order), urldefrag(url)[0], depth))
+        return True
+   
+    def pop(self):
+        _, _, url, depth = heapq.heappop(self._heap)
+        return url, depth
+   
+    def has_contact_pages(self):
+        return bool(self._heap) and self._heap[0][0] <= CONTACT_PRIORITY
+class SiteCrawl:
+    # Per-site crawl state shared by the threaded and asyncio crawlers: the frontier,
+    # what has been found so far, and the early-stop decision.
+    def __init__(self, start_url, max_depth, max_pages, rules=None,
+                 target_fields=CRAWL_TARGET_FIELDS, stale_limit=CRAWL_STALE_PAGES):
+        self.frontier = Frontier(start_url, max_depth)
+        self.max_pages = max_pages
+        self.rules = rules
+        self.target_fields = target_fields
+        self.stale_limit = stale_limit
+        self.found = {'emails': set(), 'addresses': set(), 'phones': set(), 'social_media': set()}
+        self.pages_visited = 0
+        self.stale_pages = 0
+        self.stop_reason = None
+   
+    def next_url(self):
+        # Next (url, depth) to fetch, or None when the crawl of this site is over
+        while self.frontier:
+            if self.pages_visited >= self.max_pages:
+                return None
+            if self.stale_pages >= self.stale_limit:
+                self.stop_reason = f"{self.stale_pages} pages in a row found nothing new"
+                return None
+            if all(self.found[field] for field in self.target_fields) and not self.frontier.has_contact_pages():
+                self.stop_reason = f"found {', '.join(self.target_fields)}"
+                return None
+            url, depth = self.frontier.pop()
+            if self.rules and not self.rules.allowed(url):
+                continue
+            self.pages_visited += 1
+            return url, depth
+        return None
+   
+    def add_page(self, page, depth):
+        new = False
+        for field, values in self.found.items():
+            before = len(values)
+            values.update(page[field])
+            new = new or len(values) > before
+        if new:
+            self.stale_pages = 0
+        elif any(self.found.values()):
+            # Until something turns up the contacts may be anywhere, so keep looking (up to max_pages)
+            self.stale_pages += 1
+        footer_links = set(page['footer_links'])
+        for link in page['links']:
+            self.frontier.add(link, depth + 1, link in footer_links)
+   
+    def add_failure(self):
+        self.stale_pages += 1
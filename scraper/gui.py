@@ -0,0 +1,175 @@
+# Tkinter front end; the scraping itself runs through pipeline.run_job.
+import asyncio
+import json
+import threading
+import tkinter as tk
+from tkinter import messagebox, Spinbox, scrolledtext, ttk, Checkbutton, filedialog
+from .config import DEFAULT_DEPTH, DEFAULT_MAX_PAGES, DEFAULT_OUTPUT, DEFAULT_RESULTS, ScrapeConfig
+from .maps import MAPS_DETAIL_MODES
+from .pipeline import run_job
+from .robots import ROBOTS_CACHE_FILE
+from .site_cache import SITE_CACHE_FILE
+from .sinks import parquet_available
+class ScraperApp:
+    def __init__(self, root):
+        self.root = root
+        root.title("Advanced Business Scraper (2025 Edition)")
+        root.geometry("700x700")
+        root.configure(bg='#f0f0f0')
+        # Frame
+        frame = tk.Frame(root, bg="#f0f0f0", padx=20, pady=20)
+        frame.pack(fill=tk.BOTH, expand=True)
+        # Query
+        tk.Label(frame, text="Search Query (e.g., restaurants in New York):", bg='#f0f0f0', font=('Arial', 12)).pack(anchor="w", pady=5)
+        self.entry_query = tk.Entry(frame, width=60, font=('Arial', 11))
+        self.entry_query.pack(pady=5)
+        # Max Results
+        tk.Label(frame, text="Max Results (up to 200):", bg='#f0f0f0', font=('Arial', 12)).pack(anchor="w", pady=5)
+        self.entry_results = Spinbox(frame, from_=1, to=200, width=5, font=('Arial', 11))
+        self.entry_results.pack(anchor="w", pady=5)
+        # Max Depth
+        tk.Label(frame, text="Max Crawl Depth:", bg='#f0f0f0', font=('Arial', 12)).pack(anchor="w", pady=5)
+        self.depth_entry = tk.Entry(frame, width=5, font=('Arial', 11))
+        self.depth_entry.insert(0, str(DEFAULT_DEPTH))
+        self.depth_entry.pack(anchor="w", pady=5)
+        # Max Pages per Website
+        tk.Label(frame, text="Max Pages per Website:", bg='#f0f0f0', font=('Arial', 12)).pack(anchor="w", pady=5)
+        self.max_pages_entry = tk.Entry(frame, width=5, font=('Arial', 11))
+        self.max_pages_entry.insert(0, str(DEFAULT_MAX_PAGES))
+        self.max_pages_entry.pack(anchor="w", pady=5)
+        # Maps detail mode
+        tk.Label(frame, text="Open each place on Maps (always: full address and owner, slower):", bg='#f0f0f0', font=('Arial', 12)).pack(anchor="w", pady=5)
+        self.var_maps_detail = tk.StringVar(value=MAPS_DETAIL_MODES[0])
+        ttk.Combobox(frame, textvariable=self.var_maps_detail, values=MAPS_DETAIL_MODES, state='readonly', width=10).pack(anchor="w", pady=5)
+        # Checkboxes
+        self.var_non_headless = tk.IntVar()
+        Checkbutton(frame, text="Non-Headless Mode (Visible Browser)", variable=self.var_non_headless, bg='#f0f0f0').pack(anchor="w", pady=5)
+        self.var_check_robots = tk.IntVar(value=1)
+        Checkbutton(frame, text="Check robots.txt", variable=self.var_check_robots, bg='#f0f0f0').pack(anchor="w", pady=5)
+        self.var_page_cache = tk.IntVar()
+        Checkbutton(frame, text="Cache pages between runs (revalidate with ETag/Last-Modified)", variable=self.var_page_cache, bg='#f0f0f0').pack(anchor="w", pady=5)
+        self.var_robots_cache = tk.IntVar()
+        Checkbutton(frame, text="Keep robots.txt between runs", variable=self.var_robots_cache, bg='#f0f0f0').pack(anchor="w", pady=5)
+        self.var_site_cache = tk.IntVar()
+        Checkbutton(frame, text="Reuse website results from earlier runs (24h)", variable=self.var_site_cache, bg='#f0f0f0').pack(anchor="w", pady=5)
+        # Config Buttons
+        config_frame = tk.Frame(frame, bg='#f0f0f0')
+        config_frame.pack(pady=5)
+        tk.Button(config_frame, text="Save Config", command=self.save_config, bg='#2196F3', fg='white', font=('Arial', 10)).pack(side=tk.LEFT, padx=5)
+        tk.Button(config_frame, text="Load Config", command=self.load_config, bg='#2196F3', fg='white', font=('Arial', 10)).pack(side=tk.LEFT, padx=5)
+        # Start Button
+        self.button = tk.Button(frame, text="Start Scraping", command=self.scrape_query, bg='#4CAF50', fg='white', font=('Arial', 12, 'bold'))
+        self.button.pack(pady=10)
+        # Progress Bar
+        self.progress = ttk.Progressbar(frame, orient="horizontal", length=400, mode="determinate")
+        self.progress.pack(pady=10)
+        # Text Area for Logs
+        self.text_area = scrolledtext.ScrolledText(frame, height=10, width=70, font=('Arial', 10))
+        self.text_area.pack(pady=10)
+   
+    def read_config(self):
+        config = ScrapeConfig(query=self.entry_query.get().strip())
+        try:
+            config.max_results = int(self.entry_results.get())
+        except ValueError:
+            config.max_results = DEFAULT_RESULTS
+        try:
+            config.max_depth = int(self.depth_entry.get())
+        except ValueError:
+            config.max_depth = DEFAULT_DEPTH
+        try:
+            config.max_pages = int(self.max_pages_entry.get())
+        except ValueError:
+            config.max_pages = DEFAULT_MAX_PAGES
+        config.non_headless = bool(self.var_non_headless.get())
+        config.check_robots = bool(self.var_check_robots.get())
+        config.page_cache = bool(self.var_page_cache.get())
+        config.site_cache = SITE_CACHE_FILE if self.var_site_cache.get() else ''
+        config.maps_detail = self.var_maps_detail.get()
+        config.robots_cache = ROBOTS_CACHE_FILE if self.var_robots_cache.get() else ''
+        return config
+   
+    # Worker-thread callbacks hop onto the Tk thread
+    def update_text_area(self, message):
+        def append():
+            self.text_area.insert(tk.END, message + "\n")
+            self.text_area.see(tk.END)
+        self.root.after(0, append)
+   
+    def update_progress(self, value):
+        self.root.after(0, lambda: self.progress.configure(value=value))
+   
+    def scrape_query(self):
+        config = self.read_config()
+        if not config.query:
+            messagebox.showwarning("Input Error", "Please enter a search query.")
+            return
+       
+        if config.max_results > 100:
+            if not messagebox.askyesno("Warning", "High max_results (>100) may lead to detection. Continue?"):
+                return
+        if config.max_pages > 50 or config.max_depth > 5:
+            if not messagebox.askyesno("Warning", "High max_pages (>50) or max_depth (>5) may lead to rate-limiting. Continue?"):
+                return
+       
+        # Choose the output before starting so records can be streamed to it
+        filetypes = [("CSV files", "*.csv"), ("JSON Lines files", "*.jsonl")]
+        if parquet_available():
+            filetypes.append(("Parquet files", "*.parquet"))
+        config.output = filedialog.asksaveasfilename(title="Save Results", defaultextension=".csv", filetypes=filetypes, confirmoverwrite=False) or DEFAULT_OUTPUT
+       
+        self.text_area.delete("1.0", tk.END)
+        self.text_area.insert(tk.END, "Scraping started...\n")
+        self.button.config(state='disabled')
+        self.progress['value'] = 0
+       
+        def run_scraping():
+            try:
+                asyncio.run(run_job(config, self.update_text_area, self.update_progress))
+                self.root.after(0, lambda: messagebox.showinfo("Success", f"Scraping completed. Check {config.output}"))
+            except Exception as e:
+                self.update_text_area(f"Scraping failed: {str(e)}")
+                self.root.after(0, lambda: messagebox.showerror("Error", f"Scraping failed: {str(e)}"))
+            finally:
+                def finalize():
+                    self.button.config(state='normal')
+                    self.progress['value'] = 100
+                self.root.after(0, finalize)
+        # Run scraping in a separate thread
+        threading.Thread(target=run_scraping, daemon=True).start()
+   
+    def save_config(self):
+        config = {
+            'max_depth': self.depth_entry.get(),
+            'max_pages': self.max_pages_entry.get(),
+            'non_headless': self.var_non_headless.get(),
+            'check_robots': self.var_check_robots.get(),
+            'page_cache': self.var_page_cache.get(),
+            'robots_cache': ROBOTS_CACHE_FILE if self.var_robots_cache.get() else '',
+            'site_cache': SITE_CACHE_FILE if self.var_site_cache.get() else '',
+            'maps_detail': self.var_maps_detail.get()
+        }
+        file = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files", "*.json")])
+        if file:
+            with open(file, 'w') as f:
+                json.dump(config, f)
+   
+    def load_config(self):
+        file = filedialog.askopenfilename(filetypes=[("JSON files", "*.json")])
+        if file:
+            with open(file, 'r') as f:
+                config = json.load(f)
+            self.depth_entry.delete(0, tk.END)
+            self.depth_entry.insert(0, config.get('max_depth', str(DEFAULT_DEPTH)))
+            self.max_pages_entry.delete(0, tk.END)
+            self.max_pages_entry.insert(0, config.get('max_pages', str(DEFAULT_MAX_PAGES)))
+            self.var_non_headless.set(config.get('non_headless', 0))
+            self.var_check_robots.set(config.get('check_robots', 1))
+            self.var_page_cache.set(config.get('page_cache', 0))
+            self.var_robots_cache.set(int(bool(config.get('robots_cache'))))
+            self.var_site_cache.set(int(bool(config.get('site_cache'))))
+            self.var_maps_detail.set(config.get('maps_detail', MAPS_DETAIL_MODES[0]))
+def main():
+    root = tk.Tk()
+    ScraperApp(root)
+    root.mainloop()
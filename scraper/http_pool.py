@@ -0,0 +1,93 @@
+# Per-host HTTP session pooling for the threaded crawler and robots.txt checks.
+import threading
+import time
+from collections import OrderedDict
+from importlib.util import find_spec
+from urllib.parse import urlparse
+from .config import DEFAULT_PER_HOST
+POOL_MAX_HOSTS = 100 # Max per-host HTTP sessions kept open at once
+POOL_IDLE_TIMEOUT = 30 # Seconds before an idle host session/connection is closed
+# requests/aiohttp decode 'br' responses when brotli is installed
+ACCEPT_ENCODING = 'gzip, deflate, br' if find_spec('brotli') else 'gzip, deflate'
+class ConnectionStats:
+    # Counts TCP connections opened versus requests sent, to confirm keep-alive reuse
+    def __init__(self):
+        self.connections_opened = 0
+        self.requests_sent = 0
+        self._lock = threading.Lock()
+   
+    def record_connection(self, count=1):
+        with self._lock:
+            self.connections_opened += count
+   
+    def record_request(self):
+        with self._lock:
+            self.requests_sent += 1
+   
+    def __str__(self):
+        reused = self.requests_sent - self.connections_opened
+        return f"{self.connections_opened} connections opened for {self.requests_sent} requests ({max(reused, 0)} reused)"
+class SessionPool:
+    # One requests.Session per host so every page of a site, and its robots.txt, reuse
+    # kept-alive connections. At most max_hosts sessions are kept (least recently used
+    # is closed first) and sessions idle for longer than idle_timeout are closed.
+    def __init__(self, max_hosts=POOL_MAX_HOSTS, connections_per_host=DEFAULT_PER_HOST, idle_timeout=POOL_IDLE_TIMEOUT):
+        self.max_hosts = max_hosts
+        self.connections_per_host = connections_per_host
+        self.idle_timeout = idle_timeout
+        self.stats = ConnectionStats()
+        self._sessions = OrderedDict() # host -> (session, last_used)
+        self._lock = threading.Lock()
+        self._pool_classes = None
+   
+    def _counting_pool_classes(self):
+        # urllib3 connection pools that count each connection as it is opened
+        if self._pool_classes is None:
+            from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+            stats = self.stats
+            def counting(pool_class):
+                class CountingPool(pool_class):
+                    def _new_conn(self):
+                        stats.record_connection()
+                        return super()._new_conn()
+                return CountingPool
+            self._pool_classes = {'http': counting(HTTPConnectionPool), 'https': counting(HTTPSConnectionPool)}
+        return self._pool_classes
+   
+    def _new_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.connections_per_host)
+        adapter.poolmanager.pool_classes_by_scheme = self._counting_pool_classes()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+        return session
+   
+    def _session_for(self, host):
+        now = time.monotonic()
+        with self._lock:
+            for idle_host, (session, last_used) in list(self._sessions.items()):
+                if now - last_used > self.idle_timeout:
+                    del self._sessions[idle_host]
+                    session.close()
+            if host in self._sessions:
+                session = self._sessions.pop(host)[0]
+            else:
+                session = self._new_session()
+                while len(self._sessions) >= self.max_hosts:
+                    self._sessions.popitem(last=False)[1][0].close()
+            self._sessions[host] = (session, now)
+            return session
+   
+    def get(self, url, **kwargs):
+        session = self._session_for(urlparse(url).netloc)
+        self.stats.record_request()
+        return session.get(url, **kwargs)
+   
+    def close(self):
+        with self._lock:
+            while self._sessions:
+                self._sessions.popitem()[1][0].close()
+HTTP_POOL = SessionPool()
@@ -0,0 +1,260 @@
+# Google Maps search results scraping with Playwright.
+import asyncio
+import random
+import time
+from dataclasses import dataclass, fields
+from .config import USER_AGENTS
+from .metrics import METRICS
+MAPS_SEARCH_URL = 'https://www.google.com/maps/search/{query}'
+FEED_SELECTOR = 'div[role="feed"]'
+RESULT_SELECTOR = 'a.hfpxzc'
+DETAIL_SELECTOR = 'h1.DUwDvf'
+CONSENT_SELECTOR = '[aria-label="Accept all"]'
+MAPS_DETAIL_MODE = 'missing' # 'always' open each place, only when the card is 'missing' a field, or 'never'
+MAPS_DETAIL_MODES = ('missing', 'always', 'never')
+MAPS_REQUIRED_FIELDS = ('name', 'website', 'address') # Card fields that, when empty, make 'missing' mode open the place
+# Reads name, phone, website and the street address shown on each listing card. Cards
+# only show the street part of the address, and no owner: 'always' mode gets the full
+# address and contact name from the place itself. A card part counts as the street when
+# it has a house number and a word, and is not opening hours or a rating.
+CARD_FIELDS_JS = """([selector, limit]) => Array.from(document.querySelectorAll(selector)).slice(0, limit).map((anchor, index) => {
+    const card = anchor.parentElement;
+    const text = (el) => (el && el.textContent || '').trim();
+    const phone = text(card.querySelector('.UsdlK'));
+    const website = card.querySelector('a[data-value="Website"]');
+    const hours = /\\b(open|opens|closed|closes|hours|24\\/7)\\b|\\d{1,2}(:\\d{2})?\\s*(am|pm)\\b|\\d{1,2}:\\d{2}/i;
+    const street = (part) => /\\d/.test(part) && /\\p{L}{2,}/u.test(part) && !hours.test(part) && part !== phone;
+    let address = '';
+    for (const row of card.querySelectorAll('.W4Efsd')) {
+        for (const part of row.textContent.split('·').map((p) => p.trim())) {
+            if (!address && street(part)) address = part;
+        }
+    }
+    return {index, name: (anchor.getAttribute('aria-label') || '').trim(), address, phone,
+            website: website ? website.href : ''};
+})"""
+# Reads every field of the open place in one round trip
+DETAIL_FIELDS_JS = """(headerSelector) => {
+    const label = (prefix) => {
+        const el = document.querySelector(`[aria-label^="${prefix}: "]`);
+        return el ? el.getAttribute('aria-label').split(':').slice(1).join(':').trim() : '';
+    };
+    const header = document.querySelector(headerSelector);
+    const website = document.querySelector('[aria-label^="Website: "]');
+    const owner = document.querySelector('[data-item-id="owner"]');
+    return {
+        name: header ? header.innerText.trim() : '',
+        address: label('Address'),
+        phone: label('Phone'),
+        website: website ? website.getAttribute('href') || '' : '',
+        contact_name: owner ? owner.innerText.trim() : '',
+    };
+}"""
+@dataclass
+class MapsWaits:
+    # Upper bounds (ms) for each readiness condition; the scraper moves on as soon as
+    # the condition holds, so these only matter when the page is slow or unchanged.
+    results: int = 10000 # Feed (or a single place page) visible after navigation
+    consent: int = 5000 # Feed visible again after accepting cookies
+    scroll: int = 3000 # Feed scrollHeight grows after scrolling to the bottom
+    idle_scrolls: int = 2 # Scrolls in a row without growth before the feed counts as exhausted
+    detail: int = 5000 # Place header visible after clicking a result
+    back: int = 5000 # Result list visible again after going back
+   
+    @classmethod
+    def parse(cls, spec):
+        # 'results=20000,scroll=5000' -> MapsWaits with those limits changed; '' keeps the defaults
+        waits = cls()
+        names = [field.name for field in fields(cls)]
+        for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+            name, _, value = item.partition('=')
+            if name.strip() not in names or not value.strip().isdigit():
+                raise ValueError(f"Bad Maps wait '{item}': expected name=number with name one of {', '.join(names)}")
+            setattr(waits, name.strip(), int(value))
+        return waits
+class WaitTimer:
+    # Splits a scrape's wall time into waiting on the page (per condition) and working;
+    # every wait is also recorded in the job metrics as stage maps.<label>
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.waits = {} # label -> [count, seconds]
+   
+    async def wait(self, label, awaitable):
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            elapsed = time.perf_counter() - started
+            entry = self.waits.setdefault(label, [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+            METRICS.observe(f'maps.{label}', elapsed)
+   
+    @property
+    def waiting(self):
+        return sum(seconds for _, seconds in self.waits.values())
+   
+    @property
+    def total(self):
+        return time.perf_counter() - self.started
+   
+    def __str__(self):
+        details = ', '.join(f"{label} {seconds:.1f}s/{count}" for label, (count, seconds) in self.waits.items())
+        return f"{self.total:.1f}s total, {self.waiting:.1f}s waiting ({details}), {self.total - self.waiting:.1f}s working"
+class MapsBrowser:
+    # One Chromium process and browser context, reusable across many queries
+    def __init__(self, non_headless=False):
+        self.non_headless = non_headless
+        self.browser = None
+        self.context = None
+        self._playwright = None
+   
+    async def __aenter__(self):
+        from playwright.async_api import async_playwright
+        self._playwright = await async_playwright().start()
+        try:
+            self.browser = await self._playwright.chromium.launch(headless=not self.non_headless)
+            self.context = await self.browser.new_context(user_agent=random.choice(USER_AGENTS))
+        except Exception:
+            await self._playwright.stop()
+            raise
+        return self
+   
+    async def __aexit__(self, *exc_info):
+        try:
+            await self.browser.close()
+        finally:
+            await self._playwright.stop()
+   
+    async def new_page(self):
+        return await self.context.new_page()
+async def scrape_google_maps_async(search_query, max_results, non_headless, update_callback, progress_callback,
+                                   browser=None, record_callback=None, waits=None, timer=None,
+                                   detail_mode=MAPS_DETAIL_MODE, required_fields=MAPS_REQUIRED_FIELDS):
+    # Without a shared `browser` (MapsBrowser), one is launched for this query alone.
+    # `record_callback` is awaited with each record as soon as it has been scraped.
+    # `waits` bounds each readiness wait; `timer` (a WaitTimer) collects wait/work time.
+    # `detail_mode` decides when a place is opened on top of reading its listing card.
+    if browser is None:
+        async with MapsBrowser(non_headless) as browser:
+            return await scrape_google_maps_async(search_query, max_results, non_headless, update_callback,
+                                                  progress_callback, browser, record_callback, waits, timer,
+                                                  detail_mode, required_fields)
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    waits = waits or MapsWaits()
+    timer = timer or WaitTimer()
+    data = []
+    page = await browser.new_page()
+   
+    try:
+        update_callback("Loading Google Maps...")
+        retries = 3
+        while retries > 0:
+            try:
+                await timer.wait('navigation', page.goto(MAPS_SEARCH_URL.format(query=search_query.replace(' ', '+')),
+                                                         wait_until='domcontentloaded', timeout=30000))
+                break
+            except PlaywrightTimeoutError:
+                retries -= 1
+                print(f"Retry {4-retries} for Google Maps load")
+                await asyncio.sleep(2)
+        if retries == 0:
+            update_callback("Failed to load Google Maps after retries")
+            return data
+       
+        # Wait for the results feed, a single place page, or the cookie prompt
+        ready = page.locator(f'{FEED_SELECTOR}, {DETAIL_SELECTOR}, {CONSENT_SELECTOR}').first
+        try:
+            await timer.wait('results', ready.wait_for(state='visible', timeout=waits.results))
+        except PlaywrightTimeoutError:
+            print("Results did not appear before the timeout.")
+       
+        # Accept cookies if prompted
+        consent = page.locator(CONSENT_SELECTOR)
+        if await consent.count():
+            try:
+                await consent.first.click(timeout=waits.consent)
+                await timer.wait('consent', page.locator(f'{FEED_SELECTOR}, {DETAIL_SELECTOR}').first.wait_for(state='visible', timeout=waits.consent))
+            except PlaywrightTimeoutError:
+                pass
+       
+        # Scroll until enough results are loaded or the feed stops growing
+        update_callback("Scrolling results...")
+        feed = page.locator(FEED_SELECTOR)
+        idle_scrolls = 0
+        max_scrolls = max_results // 5 + 5
+        if await feed.count():
+            for _ in range(max_scrolls):
+                if await page.locator(RESULT_SELECTOR).count() >= max_results:
+                    break
+                height = await feed.first.evaluate("feed => { const height = feed.scrollHeight; feed.scrollTop = height; return height; }")
+                try:
+                    await timer.wait('scroll', page.wait_for_function(
+                        "([selector, height]) => { const feed = document.querySelector(selector); return feed && feed.scrollHeight > height; }",
+                        arg=[FEED_SELECTOR, height], timeout=waits.scroll))
+                    idle_scrolls = 0
+                except PlaywrightTimeoutError:
+                    idle_scrolls += 1
+                    if idle_scrolls >= waits.idle_scrolls:
+                        break
+        else:
+            print("Results feed not found for scrolling.")
+       
+        # Read every listing card in one round trip
+        cards = (await timer.wait('evaluate', page.evaluate(CARD_FIELDS_JS, [RESULT_SELECTOR, max_results])))[:max_results]
+       
+        for i, card in enumerate(cards):
+            update_callback(f"Scraping result {i+1}/{len(cards)}...")
+            progress_callback((i + 1) / len(cards) * 50) # 50% for Maps
+            info = {
+                'name': card['name'],
+                'address': card['address'],
+                'phone': card['phone'],
+                'website': card['website'],
+                'contact_name': '',
+                'email': '',
+                'emails': '',
+                'website_addresses': '',
+                'phones': '',
+                'social_media': ''
+            }
+           
+            # Only open the place when the card lacks a field we need
+            if detail_mode == 'always' or (detail_mode == 'missing' and any(not info[field] for field in required_fields)):
+                METRICS.count('maps.details')
+                retries = 3
+                while retries > 0:
+                    try:
+                        await page.locator(RESULT_SELECTOR).nth(card['index']).click(timeout=3000)
+                        try:
+                            await timer.wait('detail', page.locator(DETAIL_SELECTOR).wait_for(state='visible', timeout=waits.detail))
+                        except PlaywrightTimeoutError:
+                            pass
+                        detail = await timer.wait('evaluate', page.evaluate(DETAIL_FIELDS_JS, DETAIL_SELECTOR))
+                        for field, value in detail.items():
+                            if value:
+                                info[field] = value
+                       
+                        # Go back to list and wait for results to reload
+                        await timer.wait('back', page.go_back(wait_until='domcontentloaded', timeout=5000))
+                        try:
+                            await timer.wait('back', page.locator(RESULT_SELECTOR).nth(0).wait_for(state='visible', timeout=waits.back))
+                        except PlaywrightTimeoutError:
+                            pass
+                        break
+                    except Exception as e:
+                        print(f"Retry {4-retries} for result {i+1}: {e}")
+                        retries -= 1
+                        await asyncio.sleep(2)
+           
+            data.append(info)
+            METRICS.count('maps.records')
+            if record_callback:
+                await record_callback(info)
+    except Exception as e:
+        print(f"Error scraping Google Maps for '{search_query}': {e}")
+    finally:
+        await page.close()
+        update_callback(f"Maps timing: {timer}")
+   
+    return data
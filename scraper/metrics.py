@@ -0,0 +1,173 @@
+# Per-stage latency histograms and event counters for a job, exported at the end as a
+# JSON summary or a Prometheus textfile, plus an opt-in profiler for a whole run.
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from importlib.util import find_spec
+METRICS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60) # Histogram bounds (s)
+METRICS_MAX_HOSTS = 500 # Hosts labelled individually; later ones are counted as "other"
+PROFILE_TOP = 15 # Hottest functions listed in the job log after a cProfile run
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * (len(METRICS_BUCKETS) + 1) # The last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+   
+    def observe(self, seconds):
+        self.buckets[bisect_left(METRICS_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+   
+    def merge(self, other):
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+   
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation, capped at the largest seen
+        seen = 0
+        for bound, count in zip(METRICS_BUCKETS + (self.max,), self.buckets):
+            seen += count
+            if count and seen >= q * self.count:
+                return min(bound, self.max)
+        return self.max
+   
+    def to_dict(self):
+        return {'count': self.count, 'sum': round(self.sum, 6), 'p50': round(self.quantile(0.5), 6),
+                'p90': round(self.quantile(0.9), 6), 'p99': round(self.quantile(0.99), 6), 'max': round(self.max, 6)}
+class Metrics:
+    # Thread-safe registry keyed by (stage, host); host is '' for stages that are not per host
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+   
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.histograms = {}
+            self.counters = {}
+            self._hosts = set()
+   
+    def _host(self, host):
+        if not host:
+            return ''
+        if host not in self._hosts and len(self._hosts) >= METRICS_MAX_HOSTS:
+            return 'other'
+        self._hosts.add(host)
+        return host
+   
+    def observe(self, stage, seconds, host=None):
+        with self._lock:
+            key = (stage, self._host(host))
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(seconds)
+   
+    def count(self, event, value=1, host=None):
+        with self._lock:
+            key = (event, self._host(host))
+            self.counters[key] = self.counters.get(key, 0) + value
+   
+    @contextmanager
+    def timer(self, stage, host=None):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, host)
+   
+    def stages(self):
+        # Histograms per stage with every host merged in
+        with self._lock:
+            merged = {}
+            for (stage, _), histogram in self.histograms.items():
+                merged.setdefault(stage, Histogram()).merge(histogram)
+            return merged
+   
+    def summary(self, top=8):
+        stages = sorted(self.stages().items(), key=lambda item: -item[1].sum)[:top]
+        return '; '.join(f"{stage} {h.count}x {h.sum:.1f}s (p50 {h.quantile(0.5) * 1000:.0f}ms, p99 {h.quantile(0.99) * 1000:.0f}ms)"
+                         for stage, h in stages)
+   
+    def to_json(self):
+        stages = {stage: histogram.to_dict() for stage, histogram in sorted(self.stages().items())}
+        counters = {}
+        with self._lock:
+            for (stage, host), histogram in self.histograms.items():
+                if host:
+                    stages[stage].setdefault('hosts', {})[host] = histogram.to_dict()
+            for (event, host), value in sorted(self.counters.items()):
+                entry = counters.setdefault(event, {'total': 0})
+                entry['total'] += value
+                if host:
+                    entry.setdefault('hosts', {})[host] = value
+        return {'started': self.started, 'seconds': round(time.time() - self.started, 3), 'stages': stages, 'counters': counters}
+   
+    def to_prometheus(self):
+        lines = ['# HELP scraper_stage_seconds Time spent in each pipeline stage.',
+                 '# TYPE scraper_stage_seconds histogram']
+        with self._lock:
+            for (stage, host), histogram in sorted(self.histograms.items()):
+                labels = f'stage="{stage}",host="{host}"'
+                cumulative = 0
+                for bound, count in zip(METRICS_BUCKETS + ('+Inf',), histogram.buckets):
+                    cumulative += count
+                    lines.append(f'scraper_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'scraper_stage_seconds_sum{{{labels}}} {histogram.sum}')
+                lines.append(f'scraper_stage_seconds_count{{{labels}}} {histogram.count}')
+            lines += ['# HELP scraper_events_total Pipeline events.', '# TYPE scraper_events_total counter']
+            for (event, host), value in sorted(self.counters.items()):
+                lines.append(f'scraper_events_total{{event="{event}",host="{host}"}} {value}')
+        lines.append(f'scraper_job_start_time_seconds {self.started}')
+        return '\n'.join(lines) + '\n'
+   
+    def write(self, path):
+        # .prom files are written in the Prometheus textfile format, anything else as JSON.
+        # Written to a temporary file first so a textfile collector never reads half a file.
+        content = self.to_prometheus() if path.endswith('.prom') else json.dumps(self.to_json(), indent=2)
+        with open(path + '.partial', 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(path + '.partial', path)
+METRICS = Metrics()
+@contextmanager
+def profiled(path, update_callback):
+    # Profiles the calling thread (the job's event loop) into `path`: a pyinstrument HTML
+    # report for *.html when pyinstrument is installed, cProfile stats otherwise.
+    # Parse worker processes are not included.
+    if not path:
+        yield
+        return
+    if path.endswith('.html') and find_spec('pyinstrument'):
+        from pyinstrument import Profiler
+        profiler = Profiler(async_mode='enabled')
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(profiler.output_html())
+            update_callback(f"Profile written to {path}")
+        return
+    if path.endswith('.html'):
+        path = path[:-5] + '.prof'
+        update_callback(f"pyinstrument is not installed; writing cProfile stats to {path} instead")
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(PROFILE_TOP)
+        update_callback(f"Profile written to {path} (open with python -m pstats); hottest calls:\n{report.getvalue().strip()}")
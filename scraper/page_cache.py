@@ -0,0 +1,100 @@
+# Opt-in on-disk cache of crawled pages with conditional revalidation.
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+PAGE_CACHE_FILE = 'page_cache.sqlite3' # On-disk page cache used when "Cache pages" is enabled
+PAGE_CACHE_MAX_AGE = 24 * 3600 # Seconds a cached page is served without revalidating
+PAGE_CACHE_MAX_BYTES = 500 * 1024 * 1024 # Compressed size cap; least recently used pages go first
+CachedPage = namedtuple('CachedPage', 'body etag last_modified fetched_at')
+class PageCache:
+    # Opt-in SQLite cache of crawled pages for repeat runs. Bodies are stored
+    # zlib-compressed; pages younger than max_age are served locally, older ones are
+    # revalidated with If-None-Match / If-Modified-Since so unchanged pages cost a 304.
+    # The least recently used pages are evicted once max_bytes is exceeded.
+    def __init__(self, path=PAGE_CACHE_FILE, max_age=PAGE_CACHE_MAX_AGE, max_bytes=PAGE_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # WAL and a long lock timeout: every `--worker` process shares the same cache file
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, body BLOB, size INTEGER, '
+                         'etag TEXT, last_modified TEXT, fetched_at REAL, accessed_at REAL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at)')
+        self._bytes = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+   
+    def lookup(self, url):
+        with self._lock:
+            row = self._db.execute('SELECT body, etag, last_modified, fetched_at FROM pages WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        return CachedPage(zlib.decompress(row[0]).decode('utf-8'), row[1], row[2], row[3])
+   
+    def is_fresh(self, cached):
+        return cached is not None and time.time() - cached.fetched_at < self.max_age
+   
+    def conditional_headers(self, cached):
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
+        return headers
+   
+    def serve_fresh(self, url, cached):
+        with self._lock:
+            self.hits += 1
+            self._db.execute('UPDATE pages SET accessed_at = ? WHERE url = ?', (time.time(), url))
+            self._db.commit()
+        return cached.body
+   
+    def record(self, url, status, headers, body, cached):
+        # Returns the page body to use for a network response to a (conditional) request
+        now = time.time()
+        if status == 304 and cached is not None:
+            with self._lock:
+                self.revalidated += 1
+                self._db.execute('UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?', (now, now, url))
+                self._db.commit()
+            return cached.body
+        with self._lock:
+            self.misses += 1
+            if status != 200:
+                return body
+            compressed = zlib.compress(body.encode('utf-8'))
+            old = self._db.execute('SELECT size FROM pages WHERE url = ?', (url,)).fetchone()
+            self._bytes += len(compressed) - (old[0] if old else 0)
+            self._db.execute('INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)',
+                             (url, compressed, len(compressed), headers.get('ETag'), headers.get('Last-Modified'), now, now))
+            self._evict()
+            self._db.commit()
+        return body
+   
+    def _evict(self):
+        while self._bytes > self.max_bytes:
+            rows = self._db.execute('SELECT url, size FROM pages ORDER BY accessed_at LIMIT 100').fetchall()
+            if not rows:
+                break
+            for url, size in rows:
+                self._db.execute('DELETE FROM pages WHERE url = ?', (url,))
+                self._bytes -= size
+                if self._bytes <= self.max_bytes:
+                    break
+   
+    def close(self):
+        with self._lock:
+            self._db.close()
+   
+    def __str__(self):
+        total = self.hits + self.revalidated + self.misses
+        served = self.hits + self.revalidated
+        ratio = served / total * 100 if total else 0
+        return (f"{self.hits} local hits, {self.revalidated} revalidated (304), {self.misses} misses "
+                f"({ratio:.0f}% served from cache, {self._bytes / 1024 / 1024:.1f} MiB on disk)")
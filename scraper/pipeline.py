@@ -0,0 +1,169 @@
+# Headless scraping pipeline: Google Maps results enriched with website crawl data.
+# A job runs one or more queries; every query shares one browser and one crawl queue,
+# so websites from earlier results are crawled while later Maps results are scraped.
+import asyncio
+import time
+from .config import CRAWL_QUEUE_SIZE
+from .crawl import AsyncCrawler, aggregate_results
+from .http_pool import ConnectionStats
+from .maps import MapsBrowser, MapsWaits, scrape_google_maps_async
+from .metrics import METRICS, profiled
+from .page_cache import PageCache
+from .robots import ROBOTS_CACHE
+from .site_cache import SiteResultCache
+from .sinks import open_sink
+from .task_queue import SqliteTaskQueue
+from .worker import QueuedCrawler
+def _ignore(*args):
+    pass
+class QueryReport:
+    # Per-query timings: Maps scraping time, and when its last record was crawled
+    def __init__(self, query):
+        self.query = query
+        self.started = time.perf_counter()
+        self.maps_seconds = 0.0
+        self.results = 0
+        self.skipped = 0
+        self.crawled = 0
+        self.finished = None
+   
+    def __str__(self):
+        total = (self.finished or time.perf_counter()) - self.started
+        return (f"'{self.query}': {self.results} results ({self.skipped} already saved), "
+                f"Maps {self.maps_seconds:.1f}s, done after {total:.1f}s")
+def read_queries(path):
+    # One query per line; blank lines and '#' comments are ignored
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+async def run_pipeline(config, update_callback=None, progress_callback=None, skip=None, queries=None, reports=None,
+                       browser=None, scrape_maps=scrape_google_maps_async):
+    # Async iterator of enriched records, each yielded as soon as its website crawl
+    # finishes. Runs `queries` (default: [config.query]) with one browser; `skip` is any
+    # container of records (e.g. an open sink) not to redo; `reports` collects a
+    # QueryReport per query. `browser` (an unopened MapsBrowser) and `scrape_maps` replace
+    # the Playwright layer, e.g. with fakes in tests.
+    update = update_callback or _ignore
+    progress = progress_callback or _ignore
+    queries = queries or [config.query]
+    waits = MapsWaits.parse(config.maps_waits)
+    reports = reports if reports is not None else []
+    crawl_queue = asyncio.Queue(maxsize=CRAWL_QUEUE_SIZE)
+    results = asyncio.Queue()
+    queued = [0]
+    connection_stats = ConnectionStats()
+    page_cache = PageCache() if config.page_cache else None
+    ROBOTS_CACHE.use_file(config.robots_cache)
+    site_cache = SiteResultCache(config.site_cache or None, settings=[config.max_depth, config.max_pages, config.check_robots])
+   
+    async def crawl_worker(crawler):
+        while True:
+            report, record = await crawl_queue.get()
+            try:
+                with METRICS.timer('pipeline.enrich'):
+                    result = await site_cache.crawl(record.get('website', ''), crawler.crawl)
+            except Exception as e:
+                print(f"Error crawling {record.get('website')}: {e}")
+                result = aggregate_results(set(), set(), set(), set())
+            record['emails'], record['website_addresses'], record['phones'], record['social_media'] = result
+            report.crawled += 1
+            if report.maps_seconds and report.crawled == report.results - report.skipped:
+                report.finished = time.perf_counter()
+            results.put_nowait(record)
+            crawl_queue.task_done()
+   
+    async def scrape_all(browser):
+        for number, query in enumerate(queries):
+            report = QueryReport(query)
+            reports.append(report)
+            if len(queries) > 1:
+                update(f"Query {number + 1}/{len(queries)}: {query}")
+            async def enqueue(record):
+                report.results += 1
+                if skip is not None and record in skip:
+                    report.skipped += 1
+                    return
+                queued[0] += 1
+                with METRICS.timer('pipeline.queue_wait'):
+                    await crawl_queue.put((report, record)) # Waits while the crawlers are behind
+            def maps_progress(value, number=number):
+                progress((number + value / 50) / len(queries) * 50) # 50% for Maps
+            await scrape_maps(query, config.max_results, config.non_headless, update, maps_progress,
+                              browser=browser, record_callback=enqueue, waits=waits, detail_mode=config.maps_detail)
+            report.maps_seconds = time.perf_counter() - report.started
+            METRICS.observe('maps.query', report.maps_seconds)
+            if report.skipped:
+                update(f"Skipping {report.skipped} results already saved")
+            if report.crawled == report.results - report.skipped:
+                report.finished = time.perf_counter()
+        await crawl_queue.join()
+   
+    if config.task_queue:
+        # Websites are crawled by `--worker` processes sharing the queue file
+        crawler = QueuedCrawler(SqliteTaskQueue(config.task_queue), config, update_callback=update)
+    else:
+        crawler = AsyncCrawler(config.max_depth, config.max_pages, config.check_robots, update,
+                               concurrency=config.concurrency, per_host=config.per_host, parse_workers=config.parse_workers,
+                               stats=connection_stats, page_cache=page_cache)
+    async with browser or MapsBrowser(config.non_headless) as browser, crawler:
+        update("Crawling websites as results arrive...")
+        # In task-queue mode each worker process applies --concurrency itself
+        in_flight = config.queue_depth if config.task_queue else config.concurrency
+        workers = [asyncio.ensure_future(crawl_worker(crawler)) for _ in range(in_flight)]
+        producer = asyncio.ensure_future(scrape_all(browser))
+        completed = 0
+        try:
+            while True:
+                if results.empty():
+                    if producer.done():
+                        break
+                    getter = asyncio.ensure_future(results.get())
+                    await asyncio.wait({getter, producer}, return_when=asyncio.FIRST_COMPLETED)
+                    if not getter.done():
+                        getter.cancel()
+                        continue
+                    record = getter.result()
+                else:
+                    record = results.get_nowait()
+                completed += 1
+                progress(50 + completed / max(queued[0], 1) * 50) # 50% for websites
+                yield record
+            producer.result() # Surface any scraping failure
+        finally:
+            for task in workers + [producer]:
+                task.cancel()
+            await asyncio.gather(*workers, producer, return_exceptions=True)
+            update(f"Websites: {site_cache}")
+            site_cache.close()
+            if page_cache:
+                update(f"Page cache: {page_cache}")
+                page_cache.close()
+            if config.task_queue:
+                update(f"Task queue: {crawler}")
+            else:
+                update(f"HTTP: {connection_stats}")
+                update(f"Rate control: {crawler.rate}")
+            ROBOTS_CACHE.save()
+async def run_job(config, update_callback=None, progress_callback=None, queries=None):
+    # Runs the pipeline into config.output, resuming it if it already has records.
+    # Returns the number of new records written.
+    update = update_callback or _ignore
+    reports = []
+    started = time.perf_counter()
+    METRICS.reset()
+    with profiled(config.profile, update), open_sink(config.output) as sink:
+        if sink.seen:
+            update(f"Resuming {config.output}: {len(sink.seen)} records already saved")
+        async for record in run_pipeline(config, update, progress_callback, skip=sink, queries=queries, reports=reports):
+            sink.write(record)
+    elapsed = time.perf_counter() - started
+    update(f"Slowest stages: {METRICS.summary()}")
+    if config.metrics_file:
+        METRICS.write(config.metrics_file)
+        update(f"Metrics written to {config.metrics_file}")
+    if len(reports) > 1:
+        for report in reports:
+            update(str(report))
+        update(f"Batch: {sink.written} records from {len(reports)} queries in {elapsed:.1f}s "
+               f"({sink.written / elapsed if elapsed else 0:.2f} records/sec)")
+    update(f"Scraping completed. {sink.written} new records saved to {config.output}")
+    return sink.written
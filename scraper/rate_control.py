@@ -0,0 +1,131 @@
+# Adaptive per-host request rate and retry budget for the website crawlers.
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from .config import POLITENESS_DELAY
+RATE_MIN_INTERVAL = 0.1 # Fastest request spacing for a host that never pushes back
+RATE_MAX_INTERVAL = 30 # Slowest request spacing for a host that keeps throttling
+RATE_SLOWDOWN = 2.0 # Interval multiplier on 429/503
+RATE_SPEEDUP = 0.8 # Interval multiplier after a run of successes
+RATE_SPEEDUP_AFTER = 5 # Consecutive successes before speeding up
+THROTTLE_STATUSES = {429, 503} # The host is asking us to slow down
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504} # Worth another attempt
+RETRY_ATTEMPTS = 3 # Max retries of one page
+RETRY_BUDGET_RATIO = 0.2 # Retries allowed per host, as a share of its requests...
+RETRY_BUDGET_MIN = 3 # ...but at least this many
+RETRY_AFTER_MAX = 60 # Longest Retry-After pause honoured at once
+BACKOFF_BASE = 0.5 # Seconds; doubled per attempt, then fully jittered
+BACKOFF_MAX = 10
+def parse_retry_after(value):
+    # Retry-After is either delta-seconds or an HTTP date; None if absent or unreadable
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+class HostRate:
+    # Token bucket for one host: a token every `interval` seconds, at most `burst` saved up.
+    # `floor` is the fastest the interval may go (robots.txt Crawl-delay raises it).
+    def __init__(self, interval, floor, burst=1):
+        self.interval = interval
+        self.floor = floor
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.successes = 0
+        self.requests = 0
+        self.throttled = 0
+        self.retries = 0
+   
+    def reserve(self, now):
+        # Takes a token and returns how long to wait before using it
+        if self.interval > 0:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) / self.interval)
+        else:
+            self.tokens = self.burst
+        self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens * self.interval if self.tokens < 0 else 0.0
+        return max(wait, self.blocked_until - now)
+class RateController:
+    # Shared by every crawl of a job. Each host starts at `delay` between requests, halves
+    # its speed on 429/503 (and waits out Retry-After), and speeds back up by 20% after
+    # every RATE_SPEEDUP_AFTER successes. Transient failures are retried with jittered
+    # exponential backoff while the host's retry budget lasts.
+    def __init__(self, delay=POLITENESS_DELAY, update_callback=None, max_retries=RETRY_ATTEMPTS):
+        self.delay = delay
+        self.update_callback = update_callback or (lambda message: None)
+        self.max_retries = max_retries
+        self.hosts = {}
+        self.gave_up = 0
+        self._lock = threading.Lock()
+   
+    def __str__(self):
+        throttled = sum(rate.throttled for rate in self.hosts.values())
+        retries = sum(rate.retries for rate in self.hosts.values())
+        summary = f"{len(self.hosts)} hosts, {throttled} throttled responses, {retries} retries ({self.gave_up} gave up)"
+        slowed = sorted((host for host, rate in self.hosts.items() if rate.interval > self.delay),
+                        key=lambda host: -self.hosts[host].interval)
+        if slowed:
+            summary += '; slowed: ' + ', '.join(f"{host} {self.hosts[host].interval:.2f}s" for host in slowed[:5])
+        return summary
+   
+    def _host(self, host):
+        if host not in self.hosts:
+            self.hosts[host] = HostRate(self.delay, min(self.delay, RATE_MIN_INTERVAL))
+        return self.hosts[host]
+   
+    def set_crawl_delay(self, host, crawl_delay):
+        with self._lock:
+            rate = self._host(host)
+            rate.floor = max(rate.floor, crawl_delay)
+            rate.interval = max(rate.interval, crawl_delay)
+   
+    def reserve(self, host):
+        # Seconds to wait before the next request to host may start
+        with self._lock:
+            return self._host(host).reserve(time.monotonic())
+   
+    def record(self, host, status, retry_after=None):
+        # Feeds one response status (None for a connection error or timeout) into the host's rate
+        message = None
+        with self._lock:
+            rate = self._host(host)
+            rate.requests += 1
+            if status in THROTTLE_STATUSES:
+                rate.throttled += 1
+                rate.successes = 0
+                rate.interval = min(RATE_MAX_INTERVAL, max(rate.interval * RATE_SLOWDOWN, RATE_MIN_INTERVAL, rate.floor))
+                message = f"Rate: {host} answered {status}, slowing to {rate.interval:.2f}s between requests"
+                wait = parse_retry_after(retry_after)
+                if wait:
+                    rate.blocked_until = max(rate.blocked_until, time.monotonic() + min(wait, RETRY_AFTER_MAX))
+                    message += f" and pausing {min(wait, RETRY_AFTER_MAX):.0f}s (Retry-After)"
+            elif status is None or status >= 500:
+                rate.successes = 0
+            else:
+                rate.successes += 1
+                if rate.successes >= RATE_SPEEDUP_AFTER and rate.interval > rate.floor:
+                    rate.successes = 0
+                    rate.interval = max(rate.floor, rate.interval * RATE_SPEEDUP)
+                    message = f"Rate: {host} is keeping up, speeding up to {rate.interval:.2f}s between requests"
+        if message:
+            self.update_callback(message)
+   
+    def retry_delay(self, host, attempt):
+        # Backoff before retrying a failed request (attempt counts from 0), or None once
+        # the page's attempts or the host's retry budget are used up
+        with self._lock:
+            rate = self._host(host)
+            if attempt >= self.max_retries or rate.retries >= max(RETRY_BUDGET_MIN, RETRY_BUDGET_RATIO * rate.requests):
+                self.gave_up += 1
+                return None
+            rate.retries += 1
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
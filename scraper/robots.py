@@ -0,0 +1,183 @@
+# robots.txt evaluation (RFC 9309) with a shared TTL/LRU cache of compiled rules.
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+from .http_pool import HTTP_POOL
+from .metrics import METRICS
+ROBOTS_USER_AGENT = 'BusinessScraper' # Product token matched against robots.txt User-agent lines
+ROBOTS_TTL = 24 * 3600 # Seconds a fetched robots.txt stays valid
+ROBOTS_ERROR_TTL = 600 # Seconds before retrying a robots.txt that could not be fetched
+ROBOTS_CACHE_SIZE = 1000 # Max hosts kept in the robots.txt cache
+ROBOTS_CACHE_FILE = 'robots_cache.json' # File used when "Keep robots.txt between runs" is enabled
+class RobotsRules:
+    # Compiled robots.txt rules for one host, evaluated per RFC 9309: the most specific
+    # matching User-agent group applies (falling back to '*'), the longest matching
+    # Allow/Disallow pattern wins, Allow wins ties, and '*' / '$' wildcards are honoured.
+    def __init__(self, rules=(), crawl_delay=None):
+        # Longest patterns first so the first match is the most specific one
+        self.rules = sorted(rules, key=lambda rule: (-len(rule[0]), not rule[1]))
+        self.compiled = [(re.compile(self._pattern_to_regex(pattern)), allow) for pattern, allow in self.rules]
+        self.crawl_delay = crawl_delay
+   
+    @staticmethod
+    def _pattern_to_regex(pattern):
+        anchored = pattern.endswith('$')
+        if anchored:
+            pattern = pattern[:-1]
+        regex = '.*'.join(re.escape(part) for part in pattern.split('*'))
+        return regex + ('$' if anchored else '')
+   
+    @classmethod
+    def parse(cls, text, user_agent=ROBOTS_USER_AGENT):
+        agent = user_agent.lower()
+        groups = [] # [(agents, rules, crawl_delay)]
+        in_agent_lines = False
+        for line in text.splitlines():
+            line = line.split('#', 1)[0].strip()
+            if ':' not in line:
+                continue
+            key, value = line.split(':', 1)
+            key, value = key.strip().lower(), value.strip()
+            if key == 'user-agent':
+                if not in_agent_lines:
+                    groups.append(([], [], None))
+                    in_agent_lines = True
+                groups[-1][0].append(value.lower())
+                continue
+            in_agent_lines = False
+            if not groups:
+                continue
+            if key in ('allow', 'disallow') and value:
+                groups[-1][1].append((value, key == 'allow'))
+            elif key == 'crawl-delay':
+                try:
+                    groups[-1] = (groups[-1][0], groups[-1][1], float(value))
+                except ValueError:
+                    pass
+       
+        # Groups naming our product token win over '*'; matching groups are merged
+        matching = [g for g in groups if any(a != '*' and agent.startswith(a) for a in g[0])]
+        if not matching:
+            matching = [g for g in groups if '*' in g[0]]
+        rules = [rule for g in matching for rule in g[1]]
+        delays = [g[2] for g in matching if g[2] is not None]
+        return cls(rules, max(delays) if delays else None)
+   
+    @classmethod
+    def from_response(cls, status, text):
+        if status is None:
+            return cls() # Assume allowed if can't check
+        if 200 <= status < 300:
+            return cls.parse(text)
+        if 400 <= status < 500:
+            return cls() # No robots.txt: everything allowed
+        return cls([('/', False)]) # Server error: treat the host as fully disallowed
+   
+    def allowed(self, url):
+        parsed = urlparse(url)
+        path = parsed.path or '/'
+        if path == '/robots.txt':
+            return True
+        if parsed.query:
+            path += '?' + parsed.query
+        for regex, allow in self.compiled:
+            if regex.match(path):
+                return allow
+        return True
+class RobotsCache:
+    # Thread-safe TTL/LRU cache of parsed robots.txt files keyed by origin, optionally
+    # persisted to a JSON file so the next run doesn't refetch them.
+    def __init__(self, max_hosts=ROBOTS_CACHE_SIZE, ttl=ROBOTS_TTL, path=None):
+        self.max_hosts = max_hosts
+        self.ttl = ttl
+        self.path = path
+        self._entries = OrderedDict() # origin -> (rules, expires_at, status, text)
+        self._fetch_locks = {}
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+   
+    @staticmethod
+    def origin(url):
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+   
+    def lookup(self, origin, count=True):
+        with self._lock:
+            entry = self._entries.get(origin)
+            if entry is not None and entry[1] < time.time():
+                del self._entries[origin]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(origin)
+        if count:
+            METRICS.count('robots.cache_misses' if entry is None else 'robots.cache_hits')
+        return entry and entry[0]
+   
+    def store(self, origin, status, text, expires_at=None):
+        rules = RobotsRules.from_response(status, text)
+        if expires_at is None:
+            ok = status is not None and status < 500
+            expires_at = time.time() + (self.ttl if ok else ROBOTS_ERROR_TTL)
+        with self._lock:
+            self._entries[origin] = (rules, expires_at, status, text)
+            self._entries.move_to_end(origin)
+            while len(self._entries) > self.max_hosts:
+                self._entries.popitem(last=False)
+        return rules
+   
+    def rules_for(self, url, fetch):
+        # fetch(robots_url) -> (status, text); one fetch per origin even across threads
+        origin = self.origin(url)
+        rules = self.lookup(origin)
+        if rules is not None:
+            return rules
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault(origin, threading.Lock())
+        with fetch_lock:
+            rules = self.lookup(origin, count=False) # Already counted as a miss above
+            if rules is None:
+                status, text = fetch(origin + '/robots.txt')
+                rules = self.store(origin, status, text)
+        with self._lock:
+            self._fetch_locks.pop(origin, None)
+        return rules
+   
+    def use_file(self, path):
+        # Persist to `path` (None: memory only), starting from what an earlier run saved there
+        self.path = path or None
+        if self.path:
+            self.load()
+   
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for origin, (status, text, expires_at) in saved.items():
+            if expires_at > now:
+                self.store(origin, status, text, expires_at)
+   
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            saved = {origin: [status, text, expires_at] for origin, (_, expires_at, status, text) in self._entries.items()}
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(saved, f)
+ROBOTS_CACHE = RobotsCache()
+def fetch_robots_txt(robots_url, pool=HTTP_POOL):
+    try:
+        with METRICS.timer('robots.fetch', urlparse(robots_url).netloc):
+            response = pool.get(robots_url, timeout=5)
+        return response.status_code, response.text
+    except Exception:
+        return None, ''
+def check_robots_txt(url, pool=HTTP_POOL, cache=ROBOTS_CACHE):
+    rules = cache.rules_for(url, lambda robots_url: fetch_robots_txt(robots_url, pool))
+    return rules.allowed(url)
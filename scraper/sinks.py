@@ -0,0 +1,176 @@
+# Streaming output sinks: records are written in batches as they are produced.
+import csv
+import json
+import os
+from importlib.util import find_spec
+from .metrics import METRICS
+OUTPUT_FIELDS = ['name', 'address', 'phone', 'website', 'contact_name', 'email', 'emails', 'website_addresses', 'phones', 'social_media']
+SINK_BATCH_SIZE = 10 # Records buffered before the output file is flushed
+def truncate_partial_line(path):
+    # Cuts a line-based file back to its last newline, dropping a record that was only
+    # partly written when the previous run was killed, so appends start on a fresh line
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - 4096)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b'\n')
+            if newline >= 0:
+                position = start + newline + 1
+                break
+            position = start
+        if position < end:
+            f.truncate(position)
+class RecordSink:
+    # Streams enriched records to the output file in batches as they are produced.
+    # Opening an existing file resumes it: records already in it are reported by
+    # `in` so the job can skip them, and new records are appended.
+    def __init__(self, path, batch_size=SINK_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.written = 0
+        self._batch = []
+        self.seen = set(self.record_key(record) for record in self.read_existing())
+   
+    @staticmethod
+    def record_key(record):
+        return ((record.get('name') or '').strip().lower(), (record.get('address') or '').strip().lower())
+   
+    def __contains__(self, record):
+        return self.record_key(record) in self.seen
+   
+    def read_existing(self):
+        return []
+   
+    def write(self, record):
+        self._batch.append({field: record.get(field, '') for field in OUTPUT_FIELDS})
+        self.seen.add(self.record_key(record))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+   
+    def flush(self):
+        if self._batch:
+            with METRICS.timer('sink.write'):
+                self._write_batch(self._batch)
+            METRICS.count('sink.records', len(self._batch))
+            self.written += len(self._batch)
+            self._batch = []
+   
+    def _write_batch(self, records):
+        raise NotImplementedError
+   
+    def close(self):
+        self.flush()
+   
+    def __enter__(self):
+        return self
+   
+    def __exit__(self, *exc_info):
+        self.close()
+class CsvSink(RecordSink):
+    def __init__(self, path, batch_size=SINK_BATCH_SIZE):
+        truncate_partial_line(path)
+        super().__init__(path, batch_size)
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'a', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=OUTPUT_FIELDS)
+        if new_file:
+            self._writer.writeheader()
+   
+    def read_existing(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'r', newline='', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+   
+    def _write_batch(self, records):
+        self._writer.writerows(records)
+        self._file.flush()
+   
+    def close(self):
+        super().close()
+        self._file.close()
+class JsonLinesSink(RecordSink):
+    def __init__(self, path, batch_size=SINK_BATCH_SIZE):
+        truncate_partial_line(path)
+        super().__init__(path, batch_size)
+        self._file = open(path, 'a', encoding='utf-8')
+   
+    def read_existing(self):
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    pass # Unreadable line
+        return records
+   
+    def _write_batch(self, records):
+        self._file.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records))
+        self._file.flush()
+   
+    def close(self):
+        super().close()
+        self._file.close()
+class ParquetSink(RecordSink):
+    # Parquet files cannot be appended to, so each flushed batch is written as its own
+    # complete file in a `<output>.parts` directory. close() merges the output and the parts
+    # into the output file. After a hard kill the parts are still readable: the next run
+    # resumes from them and merges them in when it closes.
+    def __init__(self, path, batch_size=SINK_BATCH_SIZE):
+        if not parquet_available():
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+        import pyarrow
+        import pyarrow.parquet
+        self._pyarrow = pyarrow
+        self._parts_dir = path + '.parts'
+        super().__init__(path, batch_size)
+        self._schema = pyarrow.schema([(field, pyarrow.string()) for field in OUTPUT_FIELDS])
+        os.makedirs(self._parts_dir, exist_ok=True)
+        self._next_part = len(self._parts())
+   
+    def _parts(self):
+        if not os.path.isdir(self._parts_dir):
+            return []
+        return sorted(os.path.join(self._parts_dir, name) for name in os.listdir(self._parts_dir) if name.endswith('.parquet'))
+   
+    def _tables(self):
+        # The output file, then every part written since it was last merged
+        paths = ([self.path] if os.path.exists(self.path) else []) + self._parts()
+        return [self._pyarrow.parquet.read_table(path) for path in paths]
+   
+    def read_existing(self):
+        return [record for table in self._tables() for record in table.to_pylist()]
+   
+    def _write_batch(self, records):
+        columns = {field: [record.get(field) or '' for record in records] for field in OUTPUT_FIELDS}
+        part = os.path.join(self._parts_dir, f'part-{self._next_part:06d}.parquet')
+        # Written under another name first, so a part file is always complete
+        self._pyarrow.parquet.write_table(self._pyarrow.table(columns, schema=self._schema), part + '.tmp')
+        os.replace(part + '.tmp', part)
+        self._next_part += 1
+   
+    def close(self):
+        super().close()
+        parts = self._parts()
+        if parts or not os.path.exists(self.path):
+            tables = [table.cast(self._schema) for table in self._tables()]
+            merged = self._pyarrow.concat_tables(tables) if tables else self._schema.empty_table()
+            self._pyarrow.parquet.write_table(merged, self.path + '.partial')
+            os.replace(self.path + '.partial', self.path)
+        for part in parts:
+            os.remove(part)
+        if os.path.isdir(self._parts_dir) and not os.listdir(self._parts_dir):
+            os.rmdir(self._parts_dir)
+def parquet_available():
+    return find_spec('pyarrow') is not None
+SINKS = {'.csv': CsvSink, '.jsonl': JsonLinesSink, '.ndjson': JsonLinesSink, '.parquet': ParquetSink}
+def open_sink(path, batch_size=SINK_BATCH_SIZE):
+    extension = os.path.splitext(path)[1].lower()
+    return SINKS.get(extension, CsvSink)(path, batch_size)
@@ -0,0 +1,97 @@
+# Per-website memoization of crawl results, so businesses sharing a site are crawled once.
+import asyncio
+import json
+import sqlite3
+import time
+from urllib.parse import urlsplit
+from .crawl import found_anything
+from .frontier import normalize_url, site_key
+SITE_CACHE_FILE = 'site_cache.sqlite3' # On-disk store used when "Reuse website results" is enabled
+SITE_CACHE_TTL = 24 * 3600 # Seconds a stored website result is reused by later runs
+SHARED_HOSTS = {'facebook.com', 'instagram.com', 'twitter.com', 'x.com', 'linkedin.com', 'tiktok.com', 'youtube.com',
+                'pinterest.com', 'yelp.com', 'tripadvisor.com', 'google.com', 'sites.google.com', 'linktr.ee',
+                'beacons.ai', 'taplink.cc', 'linkin.bio', 'bit.ly', 'goo.gl', 'wa.me', 't.me'} # Many businesses, one host
+def result_key(url):
+    # Site root for business websites; on shared platforms (and their subdomains, e.g.
+    # m.facebook.com) every page is a different business, so the whole URL minus the scheme
+    site = site_key(url)
+    if any(site == host or site.endswith('.' + host) for host in SHARED_HOSTS):
+        parts = urlsplit(normalize_url(url))
+        return site + parts.path + ('?' + parts.query if parts.query else '')
+    return site
+class SiteResultCache:
+    # Crawl results keyed by result_key: the normalized site root (host without www.), or
+    # the page on shared platforms like facebook.com. Repeat sites are
+    # answered from memory, callers for a site already being crawled wait on that crawl,
+    # and with a path the results are also kept in SQLite for ttl seconds across runs, per
+    # crawl `settings` (e.g. depth, page limit, robots.txt checks). Only results that found
+    # something are stored, so an outage or a skip is not reused by the next runs.
+    def __init__(self, path=None, ttl=SITE_CACHE_TTL, settings=None):
+        self.ttl = ttl
+        self.settings = json.dumps(settings)
+        self.results = {}
+        self.reused = 0
+        self.merged = 0
+        self.stored = 0
+        self.crawled = 0
+        self._pending = {}
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path)
+            self._db.execute('CREATE TABLE IF NOT EXISTS sites (site TEXT, settings TEXT, result TEXT, crawled_at REAL, '
+                             'PRIMARY KEY (site, settings))')
+            self._db.execute('DELETE FROM sites WHERE crawled_at < ?', (time.time() - ttl,))
+            self._db.commit()
+   
+    def __str__(self):
+        lookups = self.reused + self.merged + self.stored + self.crawled
+        ratio = 1 - self.crawled / lookups if lookups else 0
+        return (f"{self.crawled} websites crawled for {lookups} records with a website, dedup ratio {ratio:.0%} "
+                f"({self.reused} reused, {self.merged} merged in flight, {self.stored} from earlier runs)")
+   
+    def _load(self, site):
+        if self._db is None:
+            return None
+        row = self._db.execute('SELECT result, crawled_at FROM sites WHERE site = ? AND settings = ?',
+                               (site, self.settings)).fetchone()
+        if row is None or time.time() - row[1] >= self.ttl:
+            return None
+        return json.loads(row[0])
+   
+    def _finish(self, site, future):
+        del self._pending[site]
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.results[site] = future.result()
+        if self._db is not None and found_anything(future.result()):
+            self._db.execute('INSERT OR REPLACE INTO sites VALUES (?, ?, ?, ?)',
+                             (site, self.settings, json.dumps(future.result()), time.time()))
+            self._db.commit()
+   
+    async def crawl(self, url, crawl):
+        # Result of crawl(url), or of the crawl of the same site that already ran or is running
+        site = result_key(url) if url else ''
+        if not site:
+            return await crawl(url)
+        if site in self.results:
+            self.reused += 1
+            return self.results[site]
+        if site in self._pending:
+            self.merged += 1
+        else:
+            stored = self._load(site)
+            if stored is not None:
+                self.stored += 1
+                self.results[site] = stored
+                return stored
+            self.crawled += 1
+            self._pending[site] = asyncio.ensure_future(crawl(url))
+            self._pending[site].add_done_callback(lambda future, site=site: self._finish(site, future))
+        # Shielded so one cancelled caller does not cancel the crawl the others wait on
+        return await asyncio.shield(self._pending[site])
+   
+    def close(self):
+        for future in self._pending.values():
+            future.cancel()
+        if self._db is not None:
+            self._db.close()
@@ -0,0 +1,141 @@
+# Durable task queue with leases, so website crawls can be spread over worker processes.
+import json
+import sqlite3
+import time
+from collections import namedtuple
+TASK_QUEUE_FILE = 'task_queue.sqlite3' # Default queue shared by a job and its `--worker` processes
+TASK_LEASE_SECONDS = 60 # A leased task goes back to the queue if not heartbeated for this long
+TASK_MAX_ATTEMPTS = 3 # Leases of one task before it is marked failed
+TASK_POLL_INTERVAL = 1.0 # Seconds between checks for new tasks or finished results
+Task = namedtuple('Task', 'id job payload attempts')
+class TaskQueue:
+    # What the job and its workers need from a queue. SqliteTaskQueue covers processes on
+    # one host; a network broker can implement the same methods for several nodes.
+    def put(self, job, payload):
+        # Queues one task; returns its id
+        raise NotImplementedError
+   
+    def lease(self, worker, limit=1):
+        # Up to `limit` pending (or expired) tasks, now leased to `worker`
+        raise NotImplementedError
+   
+    def heartbeat(self, worker, task_ids):
+        # Extends the worker's leases; returns the ids it still holds
+        raise NotImplementedError
+   
+    def complete(self, worker, task_id, result):
+        # Stores the result; False if the lease had already passed to another worker
+        raise NotImplementedError
+   
+    def fail(self, worker, task_id, error):
+        # Gives the task back for another attempt, or marks it failed after max_attempts
+        raise NotImplementedError
+   
+    def result(self, task_id):
+        # (status, result or error) of a task
+        return self.results([task_id]).get(task_id, (None, None))
+   
+    def results(self, task_ids):
+        # {task id: (status, result or error)} for the given tasks; unknown ids are left out
+        raise NotImplementedError
+   
+    def counts(self, job=None):
+        raise NotImplementedError
+   
+    def purge(self, job):
+        raise NotImplementedError
+   
+    def close(self):
+        pass
+class SqliteTaskQueue(TaskQueue):
+    # SQLite in WAL mode; every state change is one short IMMEDIATE transaction, so any
+    # number of processes on the host can share the file.
+    def __init__(self, path=TASK_QUEUE_FILE, lease_seconds=TASK_LEASE_SECONDS, max_attempts=TASK_MAX_ATTEMPTS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS tasks (id INTEGER PRIMARY KEY, job TEXT, payload TEXT, '
+                         "status TEXT DEFAULT 'pending', worker TEXT, lease_until REAL, attempts INTEGER DEFAULT 0, "
+                         'result TEXT, updated_at REAL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_until)')
+   
+    def _transaction(self, statements):
+        # Runs (sql, params) pairs atomically; returns the cursor of the last one
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            for sql, params in statements:
+                cursor = self._db.execute(sql, params)
+            self._db.execute('COMMIT')
+            return cursor
+        except BaseException:
+            self._db.execute('ROLLBACK')
+            raise
+   
+    def put(self, job, payload):
+        return self._transaction([('INSERT INTO tasks (job, payload, updated_at) VALUES (?, ?, ?)',
+                                   (job, json.dumps(payload), time.time()))]).lastrowid
+   
+    def lease(self, worker, limit=1):
+        now = time.time()
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            # Leases that ran out on their last attempt are not handed out again
+            self._db.execute("UPDATE tasks SET status = 'failed', result = ?, updated_at = ? "
+                             "WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+                             (json.dumps('lease expired'), now, now, self.max_attempts))
+            rows = self._db.execute("SELECT id, job, payload, attempts FROM tasks WHERE status = 'pending' "
+                                    "OR (status = 'leased' AND lease_until < ?) ORDER BY id LIMIT ?", (now, limit)).fetchall()
+            for row in rows:
+                self._db.execute("UPDATE tasks SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1, "
+                                 'updated_at = ? WHERE id = ?', (worker, now + self.lease_seconds, now, row[0]))
+            self._db.execute('COMMIT')
+        except BaseException:
+            self._db.execute('ROLLBACK')
+            raise
+        return [Task(task_id, job, json.loads(payload), attempts + 1) for task_id, job, payload, attempts in rows]
+   
+    def heartbeat(self, worker, task_ids):
+        if not task_ids:
+            return []
+        now = time.time()
+        marks = ', '.join('?' * len(task_ids))
+        self._transaction([(f"UPDATE tasks SET lease_until = ?, updated_at = ? WHERE worker = ? AND status = 'leased' "
+                            f'AND id IN ({marks})', (now + self.lease_seconds, now, worker, *task_ids))])
+        return [row[0] for row in self._db.execute(f"SELECT id FROM tasks WHERE worker = ? AND status = 'leased' AND id IN ({marks})",
+                                                   (worker, *task_ids))]
+   
+    def complete(self, worker, task_id, result):
+        cursor = self._transaction([("UPDATE tasks SET status = 'done', result = ?, updated_at = ? "
+                                     "WHERE id = ? AND worker = ? AND status = 'leased'",
+                                     (json.dumps(result), time.time(), task_id, worker))])
+        return cursor.rowcount == 1
+   
+    def fail(self, worker, task_id, error):
+        self._transaction([("UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                            "result = ?, worker = NULL, updated_at = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                            (self.max_attempts, json.dumps(str(error)), time.time(), task_id, worker))])
+   
+    def results(self, task_ids):
+        found = {}
+        task_ids = list(task_ids)
+        for start in range(0, len(task_ids), 500): # Within SQLite's limit on query parameters
+            chunk = task_ids[start:start + 500]
+            rows = self._db.execute(f"SELECT id, status, result FROM tasks WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+            for task_id, status, result in rows:
+                found[task_id] = (status, json.loads(result) if result else None)
+        return found
+   
+    def counts(self, job=None):
+        if job is None:
+            rows = self._db.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status')
+        else:
+            rows = self._db.execute('SELECT status, COUNT(*) FROM tasks WHERE job = ? GROUP BY status', (job,))
+        return dict(rows.fetchall())
+   
+    def purge(self, job):
+        self._transaction([('DELETE FROM tasks WHERE job = ?', (job,))])
+   
+    def close(self):
+        self._db.close()
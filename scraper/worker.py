@@ -0,0 +1,148 @@
+# Worker mode: website crawls handed out through a TaskQueue. A job run with a task queue
+# puts one task per website and waits for the results; any number of `--worker`
+# processes, started before or during the job, lease the tasks and write results back.
+import asyncio
+import os
+import socket
+import time
+from .crawl import AsyncCrawler, skipped_result
+from .page_cache import PageCache
+from .robots import ROBOTS_CACHE
+from .task_queue import TASK_POLL_INTERVAL, TASK_QUEUE_FILE
+TASK_WAIT_WARNING = 30 # Seconds a task may wait unleased before the job warns that no worker is running
+def _ignore(*args):
+    pass
+def worker_name():
+    return f"{socket.gethostname()}-{os.getpid()}"
+class QueuedCrawler:
+    # Stands in for AsyncCrawler in a job whose crawls run on workers: crawl(url) queues a
+    # task carrying the job's crawl limits and waits for a worker to finish it. One poll
+    # per TASK_POLL_INTERVAL reads the status of every outstanding task and wakes their
+    # crawls. While tasks sit unleased for wait_warning seconds it warns, every
+    # wait_warning seconds, that no worker seems to be running.
+    def __init__(self, queue, config, job=None, update_callback=None, wait_warning=TASK_WAIT_WARNING):
+        self.queue = queue
+        self.config = config
+        self.job = job or f"{worker_name()}-{int(time.time())}"
+        self.update_callback = update_callback or _ignore
+        self.wait_warning = wait_warning
+        self.queued = 0
+        self._waiting = {} # task id -> [future, when it was last seen leased or queued]
+        self._poller = None
+        self._warned_at = time.monotonic()
+   
+    def __str__(self):
+        counts = self.queue.counts(self.job)
+        return f"{self.queued} crawls queued for workers ({', '.join(f'{n} {status}' for status, n in sorted(counts.items()))})"
+   
+    async def __aenter__(self):
+        return self
+   
+    async def __aexit__(self, *exc_info):
+        if self._poller:
+            self._poller.cancel()
+            await asyncio.gather(self._poller, return_exceptions=True)
+        self.queue.purge(self.job)
+        self.queue.close()
+   
+    async def crawl(self, start_url):
+        if not start_url:
+            return skipped_result(start_url)
+        self.queued += 1
+        task_id = self.queue.put(self.job, {'website': start_url, 'max_depth': self.config.max_depth,
+                                            'max_pages': self.config.max_pages, 'check_robots': self.config.check_robots})
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[task_id] = [future, time.monotonic()]
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.ensure_future(self._poll())
+        try:
+            return await future
+        finally:
+            self._waiting.pop(task_id, None)
+   
+    async def _poll(self):
+        while self._waiting:
+            await asyncio.sleep(TASK_POLL_INTERVAL)
+            statuses = self.queue.results(list(self._waiting))
+            now = time.monotonic()
+            unleased = 0
+            for task_id, waiter in list(self._waiting.items()):
+                future = waiter[0]
+                status, result = statuses.get(task_id, (None, None))
+                if future.done():
+                    continue
+                if status == 'done':
+                    future.set_result(result)
+                elif status in ('failed', None):
+                    future.set_exception(RuntimeError(f"crawl failed on every attempt: {result}"))
+                elif status == 'leased':
+                    waiter[1] = now
+                elif now - waiter[1] >= self.wait_warning:
+                    unleased += 1
+            if unleased and now - self._warned_at >= self.wait_warning:
+                self._warned_at = now
+                self.update_callback(f"{unleased} websites are waiting with no worker taking them; start one with "
+                                     f"python -m scraper --worker --task-queue {self.config.task_queue or TASK_QUEUE_FILE}")
+async def run_worker(config, queue, update_callback=None, worker=None, idle_exit=None):
+    # Leases up to config.concurrency crawl tasks at a time, heartbeats their leases while
+    # they run and writes each result back. Runs until cancelled, or until it has had
+    # nothing to do for idle_exit seconds. Returns the number of tasks completed.
+    update = update_callback or _ignore
+    worker = worker or worker_name()
+    running = {} # task id -> asyncio task
+    completed = [0]
+    page_cache = PageCache() if config.page_cache else None
+    ROBOTS_CACHE.use_file(config.robots_cache)
+   
+    async def run_task(crawler, task):
+        settings = task.payload
+        try:
+            result = await crawler.crawl(settings['website'], settings.get('max_depth'), settings.get('max_pages'),
+                                         settings.get('check_robots'))
+        except Exception as e:
+            print(f"Error crawling {settings['website']}: {e}")
+            queue.fail(worker, task.id, e)
+            return
+        if queue.complete(worker, task.id, result):
+            completed[0] += 1
+            update(f"Task {task.id} done: {settings['website']} (attempt {task.attempts})")
+        else:
+            update(f"Task {task.id} lease was lost before it finished; another worker owns it now")
+   
+    async with AsyncCrawler(config.max_depth, config.max_pages, config.check_robots, update,
+                            concurrency=config.concurrency, per_host=config.per_host,
+                            parse_workers=config.parse_workers, page_cache=page_cache) as crawler:
+        update(f"Worker {worker} waiting for tasks")
+        idle_since = last_heartbeat = time.monotonic()
+        try:
+            while True:
+                free = config.concurrency - len(running)
+                if free > 0:
+                    for task in queue.lease(worker, free):
+                        running[task.id] = asyncio.ensure_future(run_task(crawler, task))
+                now = time.monotonic()
+                if running:
+                    idle_since = now
+                elif idle_exit is not None and now - idle_since >= idle_exit:
+                    break
+                if running and now - last_heartbeat >= queue.lease_seconds / 3:
+                    held = set(queue.heartbeat(worker, list(running)))
+                    last_heartbeat = now
+                    for task_id in set(running) - held:
+                        update(f"Task {task_id} lease expired; leaving it to another worker")
+                        running.pop(task_id).cancel()
+                if running:
+                    await asyncio.wait(running.values(), timeout=TASK_POLL_INTERVAL)
+                else:
+                    await asyncio.sleep(TASK_POLL_INTERVAL)
+                for task_id in [task_id for task_id, future in running.items() if future.done()]:
+                    del running[task_id]
+        finally:
+            for future in running.values():
+                future.cancel()
+            await asyncio.gather(*running.values(), return_exceptions=True)
+            if page_cache:
+                page_cache.close()
+            ROBOTS_CACHE.save()
+            update(f"Worker {worker} stopping after {completed[0]} tasks")
+    return completed[0]
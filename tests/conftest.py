@@ -0,0 +1,44 @@
+# Shared fixtures: local HTTP sites scripted per test.
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+   
+    def handle_error(self, request, client_address):
+        pass # Clients that give up mid-response are expected in these tests
+@pytest.fixture
+def serve():
+    # serve(respond) starts a keep-alive server on its own port, so each call is a separate
+    # host, and returns its base URL. respond(path) returns (status, headers, body);
+    # with request_headers=True it is called as respond(path, headers).
+    servers = []
+   
+    def start(respond, request_headers=False):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+           
+            def do_GET(self):
+                status, headers, body = respond(self.path, self.headers) if request_headers else respond(self.path)
+                body = body.encode() if isinstance(body, str) else body
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            def log_message(self, *args):
+                pass
+        server = QuietServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f'http://127.0.0.1:{server.server_port}/'
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+def html(body):
+    return 200, {'Content-Type': 'text/html; charset=utf-8'}, f'<html><body>{body}</body></html>'
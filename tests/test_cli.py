@@ -0,0 +1,13 @@
+import json
+from scraper.cli import build_parser, config_from_args
+from scraper.config import DEFAULT_DEPTH, ScrapeConfig
+def test_options_override_the_config_file(tmp_path):
+    path = tmp_path / 'job.json'
+    path.write_text(json.dumps({'query': 'bakeries', 'max_pages': '12', 'check_robots': 1, 'site_cache': 'saved.sqlite3'}))
+    config = config_from_args(build_parser().parse_args(['cafes', '--config', str(path), '--no-robots', '--max-depth', '4']))
+    assert (config.query, config.max_pages, config.max_depth) == ('cafes', 12, 4)
+    assert config.check_robots is False and config.site_cache == 'saved.sqlite3'
+def test_options_not_given_keep_the_defaults():
+    config = config_from_args(build_parser().parse_args(['cafes', '--site-cache', 'sites.sqlite3']))
+    assert config.site_cache == 'sites.sqlite3'
+    assert config.max_depth == DEFAULT_DEPTH and config.to_dict() == ScrapeConfig(query='cafes', site_cache='sites.sqlite3').to_dict()
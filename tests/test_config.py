@@ -0,0 +1,5 @@
+from scraper.config import default_parse_workers
+def test_parse_workers_default_to_a_thread_on_one_core():
+    assert default_parse_workers(None) == 0
+    assert default_parse_workers(1) == 0
+    assert default_parse_workers(8) == 8
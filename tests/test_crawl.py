@@ -0,0 +1,33 @@
+import asyncio
+import pytest
+from conftest import html
+from scraper.crawl import AsyncCrawler
+from scraper.metrics import METRICS
+PAGES = {
+    '/': '<a href="/menu">Menu</a> <a href="/contact">Contact</a> <a href="https://www.facebook.com/joes">Facebook</a>',
+    '/menu': '<p>Pizza, pasta &amp; salads. Call (555) 300-0001.</p>',
+    '/contact': '<p>Write to <a href="mailto:info@joes.example">us</a>, or visit 12 Main Street, Springfield, IL 62701.</p>',
+}
+def quiet(message):
+    pass
+@pytest.mark.parametrize('parse_workers', [0, 2])
+def test_parse_workers_give_the_same_result_as_the_thread(serve, parse_workers):
+    url = serve(lambda path: html(PAGES[path]) if path in PAGES else (404, {}, ''))
+    crawler = AsyncCrawler(1, 10, False, quiet, parse_workers=parse_workers)
+    METRICS.reset()
+   
+    async def crawl():
+        async with crawler:
+            return await crawler.crawl(url), crawler.parse_executor
+    (emails, addresses, phones, social), executor = asyncio.run(crawl())
+    assert (emails, phones, social) == ('info@joes.example', '(555) 300-0001', 'https://www.facebook.com/joes')
+    assert '12 Main Street' in addresses
+    # The worker's timings come back with each page and are recorded in the job's process
+    stages = METRICS.stages()
+    assert stages['parse.scan'].count == stages['parse.extract'].count == stages['parse.queue'].count == len(PAGES)
+    if parse_workers:
+        assert crawler.parse_executor is None # The crawler's own pool is shut down on exit
+        with pytest.raises(RuntimeError):
+            executor.submit(quiet, '')
+    else:
+        assert executor is None
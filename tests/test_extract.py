@@ -0,0 +1,40 @@
+import pytest
+from scraper.extract import available_backends, extract_page, scan_document
+URL = 'https://joes.example/about/'
+DOCUMENTS = {
+    'hidden text': ('<html><head><style>.a{content:"style@joes.example"}</style>'
+                    '<script>var phone = "(555) 300-9999"; var mail = "script@joes.example";</script></head>'
+                    '<body><template><p>template@joes.example</p></template><p>Email info@joes.example</p></body></html>'),
+    'mailto and tel': ('<html><body><a href="mailto:orders@joes.example?subject=Order%20enquiry">Order</a> '
+                       '<a href="tel:+1-555-300-0001">Call us</a> <a href="MAILTO:Hello@joes.example">Hi</a></body></html>'),
+    'footer links': ('<html><body><a href="/menu">Menu</a><footer><p><a href="/impressum">Impressum</a></p>'
+                     '<a href="https://www.facebook.com/joes-pizza">Facebook</a></footer>'
+                     '<a href="https://instagram.com/joes">Instagram</a></body></html>'),
+    'entities': ('<html><body><p>Visit&#58; 12&nbsp;Main Street, Springfield, IL 62701.</p>'
+                 '<p>Joe&#39;s Pizza &amp; Pasta &ndash; info&#64;joes.example, call&nbsp;(555)&#32;300-0002</p></body></html>'),
+    'xml declaration': ('<?xml version="1.0" encoding="utf-8"?>\n<html xmlns="http://www.w3.org/1999/xhtml"><body>'
+                        '<p>Write to xml@joes.example or call (555) 300-0003.</p><a href="contact">Contact</a></body></html>'),
+}
+EXPECTED = {
+    'hidden text': {'emails': {'info@joes.example'}, 'phones': set()},
+    'mailto and tel': {'emails': {'orders@joes.example', 'Hello@joes.example'}, 'phones': {'+1-555-300-0001'}},
+    'footer links': {'social_media': {'https://www.facebook.com/joes-pizza', 'https://instagram.com/joes'},
+                     'footer_links': ['https://joes.example/impressum', 'https://www.facebook.com/joes-pizza']},
+    'entities': {'emails': {'info@joes.example'}, 'phones': {'(555) 300-0002'},
+                 'addresses': {'12\xa0Main Street, Springfield, IL 62701'}},
+    'xml declaration': {'emails': {'xml@joes.example'}, 'phones': {'(555) 300-0003'},
+                        'links': ['https://joes.example/about/contact']},
+}
+@pytest.mark.parametrize('backend', available_backends())
+@pytest.mark.parametrize('case', list(DOCUMENTS))
+def test_backends_agree(backend, case):
+    page = extract_page(DOCUMENTS[case], URL, backend)
+    assert page == extract_page(DOCUMENTS[case], URL, 'stdlib')
+    for field, value in EXPECTED[case].items():
+        assert page[field] == value
+def test_lxml_falls_back_on_an_encoding_declaration():
+    pytest.importorskip('lxml')
+    from scraper.extract import _scan_lxml
+    with pytest.raises(ValueError):
+        _scan_lxml(DOCUMENTS['xml declaration'])
+    assert scan_document(DOCUMENTS['xml declaration'], 'lxml')[1] == ['contact']
@@ -0,0 +1,60 @@
+import pytest
+from scraper.frontier import CONTACT_PRIORITY, Frontier, normalize_url, site_key, url_priority
+@pytest.mark.parametrize('path', ['/contact', '/contact-us', '/Contact_Us.html', '/de/kontakt', '/about', '/about-us/',
+                                  '/impressum.php', '/pages/team', '/legal-notice'])
+def test_contact_pages_come_first(path):
+    assert url_priority('https://example.com' + path, 3) == CONTACT_PRIORITY
+@pytest.mark.parametrize('path', ['/steam-cleaning', '/paralegal-services', '/blog/about-our-menu', '/contacts-lens-shop',
+                                  '/teamwork', '/aboutique'])
+def test_words_inside_other_segments_are_not_contact_pages(path):
+    assert url_priority('https://example.com' + path, 3) > CONTACT_PRIORITY
+def test_contact_pages_hold_off_early_stop_only_when_they_are_real():
+    frontier = Frontier('https://example.com/', 2)
+    frontier.pop()
+    frontier.add('https://example.com/steam-cleaning', 1)
+    assert not frontier.has_contact_pages()
+    frontier.add('https://example.com/contact-us', 1)
+    assert frontier.has_contact_pages()
+def test_link_variants_are_deduplicated():
+    frontier = Frontier('https://www.example.com/', 2)
+    assert frontier.add('https://www.example.com/menu?utm_source=x#top', 1)
+    assert not frontier.add('HTTPS://WWW.EXAMPLE.COM:443/menu/', 1)
+    assert not frontier.add('https://other.example/menu', 1)
+    assert not frontier.add('https://www.example.com/menu.pdf', 1)
+    assert normalize_url('https://Example.com/a/?b=2&a=1&gclid=x') == 'https://example.com/a?a=1&b=2'
+    assert site_key('http://www.example.com:8080/x') == 'example.com:8080'
+def tree_site(serve, pages, fanout, contact_page):
+    # Pages linked as a tree (page n links to n*fanout+1 ...); contacts only on `contact_page`
+    from conftest import html
+    def respond(path):
+        number = 0 if path == '/' else int(path.rsplit('-', 1)[-1])
+        links = ''.join(f'<a href="/page-{child}">Section {child}</a> '
+                        for child in range(number * fanout + 1, min((number + 1) * fanout + 1, pages)))
+        contacts = '<p>Call (555) 300-0001 or write to <a href="mailto:info@deep.example">us</a>.</p>' if number == contact_page else ''
+        return html(f'<a href="/">Home</a> {links}{contacts}<p>Family owned since 1990.</p>')
+    return serve(respond)
+def test_contacts_on_the_deepest_page_are_found(serve):
+    from scraper.crawl import crawl_and_aggregate
+    from scraper.http_pool import SessionPool
+    from scraper.rate_control import RateController
+    url = tree_site(serve, 12, 3, 11)
+    pool = SessionPool()
+    emails, _, phones, _ = crawl_and_aggregate(url, 3, 30, False, lambda message: None, pool, rate=RateController(0))
+    pool.close()
+    assert (emails, phones) == ('info@deep.example', '(555) 300-0001')
+def test_stale_pages_stop_the_crawl_once_something_is_found():
+    from scraper.frontier import CRAWL_STALE_PAGES, SiteCrawl
+    site = SiteCrawl('https://example.com/', 3, 100)
+    empty = {'emails': [], 'addresses': [], 'phones': [], 'social_media': [], 'links': [], 'footer_links': []}
+    links = [f'https://example.com/page-{i}' for i in range(50)]
+    site.next_url()
+    site.add_page(dict(empty, links=links), 0)
+    for _ in range(CRAWL_STALE_PAGES * 2): # Nothing found yet: keep going
+        site.next_url()
+        site.add_page(empty, 1)
+    site.next_url()
+    site.add_page(dict(empty, phones=['(555) 300-0001']), 1)
+    for _ in range(CRAWL_STALE_PAGES):
+        assert site.next_url() is not None
+        site.add_page(empty, 1)
+    assert site.next_url() is None and 'found nothing new' in site.stop_reason
@@ -0,0 +1,17 @@
+from conftest import html
+from scraper.http_pool import SessionPool
+def test_connections_are_counted_while_sessions_are_open(serve):
+    url = serve(lambda path: html('ok'))
+    pool = SessionPool()
+    for _ in range(5):
+        pool.get(url + 'page')
+    assert (pool.stats.connections_opened, pool.stats.requests_sent) == (1, 5)
+    pool.close()
+    assert pool.stats.connections_opened == 1
+def test_each_host_gets_its_own_connection(serve):
+    urls = [serve(lambda path: html('ok')) for _ in range(3)]
+    pool = SessionPool()
+    for url in urls * 2:
+        pool.get(url)
+    assert str(pool.stats) == '3 connections opened for 6 requests (3 reused)'
+    pool.close()
@@ -0,0 +1,89 @@
+# Runs the Maps result loop in Chromium against benchmarks/fixtures/maps_feed.html, a
+# static stand-in for the results page: lazy loading on scroll, a delayed detail view
+# per place and history navigation back to the list. Skipped when Chromium cannot start.
+import asyncio
+import os
+import pytest
+from scraper import maps
+from scraper.metrics import METRICS
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures', 'maps_feed.html')
+FIXTURE_DELAY_MS = 100 # Fixture delay for lazy loads and detail views
+_chromium = {}
+def require_chromium():
+    if 'error' not in _chromium:
+        async def launch():
+            async with maps.MapsBrowser():
+                pass
+        try:
+            asyncio.run(launch())
+            _chromium['error'] = None
+        except Exception as e:
+            _chromium['error'] = str(e).strip().splitlines()[0]
+    if _chromium['error'] is not None:
+        pytest.skip(f"Chromium is not available: {_chromium['error']}")
+@pytest.fixture
+def maps_fixture(serve, monkeypatch):
+    require_chromium()
+    with open(FIXTURE, 'rb') as f:
+        page = f.read()
+    url = serve(lambda path: (200, {'Content-Type': 'text/html; charset=utf-8'}, page))
+    monkeypatch.setattr(maps, 'MAPS_SEARCH_URL', f'{url}maps_feed.html?q={{query}}&total=30'
+                                                 f'&scroll_ms={FIXTURE_DELAY_MS}&detail_ms={FIXTURE_DELAY_MS}')
+def test_wait_limits_are_parsed_from_a_spec():
+    waits = maps.MapsWaits.parse(' results=20000,scroll=5000 ')
+    assert (waits.results, waits.scroll, waits.detail) == (20000, 5000, maps.MapsWaits().detail)
+    assert maps.MapsWaits.parse('') == maps.MapsWaits()
+    for spec in ('results', 'results=fast', 'speed=10'):
+        with pytest.raises(ValueError):
+            maps.MapsWaits.parse(spec)
+    from scraper.cli import build_parser
+    assert build_parser().parse_args(['--maps-waits', 'back=9000']).maps_waits == 'back=9000'
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(['--maps-waits', 'speed=10'])
+def place(i):
+    # What the fixture shows for place i
+    return {'name': f'Fixture Business {i}', 'street': f'{100 + i} Main Street',
+            'address': f'{100 + i} Main Street, Springfield, IL 62701', 'phone': f'(555) 010-{i:04d}',
+            'website': f'http://business{i}.example/' if i % 3 else '', 'owner': f'Owner {i}' if i % 4 == 0 else ''}
+def scrape(max_results, detail_mode, timer=None):
+    streamed = []
+    async def record_callback(record):
+        streamed.append(record)
+    records = asyncio.run(maps.scrape_google_maps_async('fixture', max_results, False, lambda message: None, lambda value: None,
+                                                        record_callback=record_callback, detail_mode=detail_mode,
+                                                        timer=timer, waits=maps.MapsWaits(scroll=1000, detail=2000, back=2000)))
+    assert streamed == records
+    return records
+def test_cards_are_read_after_scrolling_without_opening_places(maps_fixture):
+    METRICS.reset()
+    timer = maps.WaitTimer()
+    records = scrape(25, 'never', timer)
+    assert [record['name'] for record in records] == [place(i)['name'] for i in range(25)]
+    for i, record in enumerate(records):
+        # Every 5th card shows opening hours where the street would be; they must not become the address
+        assert record['address'] == ('' if i % 5 == 4 else place(i)['street'])
+        assert (record['phone'], record['website'], record['contact_name']) == (place(i)['phone'], place(i)['website'], '')
+    assert timer.waits['scroll'][0] >= 2 # Three lazy-loaded batches of 10
+    assert 'detail' not in timer.waits
+    assert METRICS.counters.get(('maps.details', ''), 0) == 0
+def test_always_mode_reads_every_place(maps_fixture):
+    records = scrape(6, 'always')
+    for i, record in enumerate(records):
+        expected = place(i)
+        assert (record['name'], record['address'], record['phone'], record['website'], record['contact_name']) == \
+            (expected['name'], expected['address'], expected['phone'], expected['website'], expected['owner'])
+def test_missing_mode_opens_only_incomplete_cards(maps_fixture):
+    METRICS.reset()
+    records = scrape(10, 'missing')
+    incomplete = [i for i in range(10) if not place(i)['website'] or i % 5 == 4]
+    assert METRICS.counters[('maps.details', '')] == len(incomplete)
+    for i, record in enumerate(records):
+        assert record['address'] == (place(i)['address'] if i in incomplete else place(i)['street'])
+        assert record['website'] == place(i)['website']
+def test_readiness_waits_replace_fixed_sleeps(maps_fixture):
+    # The old loop slept 3s + 1.5s per scroll + 4s per opened place; 5 places alone were 23s
+    timer = maps.WaitTimer()
+    records = scrape(5, 'always', timer)
+    assert len(records) == 5
+    assert timer.total < 15
+    assert timer.waits['detail'][0] == 5 and timer.waits['detail'][1] < 5 * 1.5
@@ -0,0 +1,61 @@
+import json
+from scraper import metrics
+from scraper.metrics import METRICS_BUCKETS, Histogram, Metrics
+def test_quantiles_are_bucket_bounds_capped_at_the_largest_value():
+    histogram = Histogram()
+    for seconds in [0.003] * 90 + [0.2] * 9 + [0.7]:
+        histogram.observe(seconds)
+    assert histogram.quantile(0.5) == 0.005
+    assert histogram.quantile(0.9) == 0.005
+    assert histogram.quantile(0.95) == 0.25
+    assert histogram.quantile(1) == 0.7 # In the 1s bucket, but never above the max
+    assert Histogram().quantile(0.5) == 0
+    slow = Histogram()
+    slow.observe(120) # Beyond the last bound
+    assert slow.quantile(0.5) == 120 and slow.buckets[-1] == 1
+def test_prometheus_buckets_are_cumulative():
+    registry = Metrics()
+    for seconds in (0.002, 0.02, 0.02, 100):
+        registry.observe('http.fetch', seconds, 'a.example')
+    registry.count('http.200', 3, 'a.example')
+    lines = registry.to_prometheus().splitlines()
+    labels = 'stage="http.fetch",host="a.example"'
+    buckets = [line for line in lines if line.startswith(f'scraper_stage_seconds_bucket{{{labels},')]
+    assert len(buckets) == len(METRICS_BUCKETS) + 1
+    assert buckets[0] == f'scraper_stage_seconds_bucket{{{labels},le="0.001"}} 0'
+    assert buckets[1] == f'scraper_stage_seconds_bucket{{{labels},le="0.005"}} 1'
+    assert buckets[3] == f'scraper_stage_seconds_bucket{{{labels},le="0.025"}} 3'
+    assert buckets[-2] == f'scraper_stage_seconds_bucket{{{labels},le="60"}} 3'
+    assert buckets[-1] == f'scraper_stage_seconds_bucket{{{labels},le="+Inf"}} 4'
+    assert f'scraper_stage_seconds_sum{{{labels}}} {0.002 + 0.02 + 0.02 + 100}' in lines
+    assert f'scraper_stage_seconds_count{{{labels}}} 4' in lines
+    assert 'scraper_events_total{event="http.200",host="a.example"} 3' in lines
+def test_json_merges_hosts_per_stage_and_keeps_them_listed():
+    registry = Metrics()
+    registry.observe('http.fetch', 0.1, 'a.example')
+    registry.observe('http.fetch', 0.3, 'b.example')
+    registry.observe('pipeline.enrich', 2)
+    registry.count('http.200', host='a.example')
+    registry.count('http.200', 2, 'b.example')
+    summary = json.loads(json.dumps(registry.to_json()))
+    fetch = summary['stages']['http.fetch']
+    assert (fetch['count'], fetch['sum'], fetch['max']) == (2, 0.4, 0.3)
+    assert fetch['hosts']['b.example']['count'] == 1
+    assert 'hosts' not in summary['stages']['pipeline.enrich']
+    assert summary['counters']['http.200'] == {'total': 3, 'hosts': {'a.example': 1, 'b.example': 2}}
+def test_hosts_beyond_the_limit_are_counted_as_other(monkeypatch):
+    monkeypatch.setattr(metrics, 'METRICS_MAX_HOSTS', 2)
+    registry = Metrics()
+    for host in ('a.example', 'b.example', 'c.example', 'd.example', 'a.example'):
+        registry.count('http.200', host=host)
+    registry.observe('http.fetch', 0.1, 'e.example')
+    assert registry.to_json()['counters']['http.200']['hosts'] == {'a.example': 2, 'b.example': 1, 'other': 2}
+    assert ('http.fetch', 'other') in registry.histograms
+def test_written_file_format_follows_the_extension(tmp_path):
+    registry = Metrics()
+    registry.observe('parse.scan', 0.01)
+    registry.write(str(tmp_path / 'job.prom'))
+    registry.write(str(tmp_path / 'job.json'))
+    assert (tmp_path / 'job.prom').read_text().startswith('# HELP scraper_stage_seconds')
+    assert json.loads((tmp_path / 'job.json').read_text())['stages']['parse.scan']['count'] == 1
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['job.json', 'job.prom']
@@ -0,0 +1,88 @@
+import asyncio
+import os
+import time
+import pytest
+from conftest import html
+from scraper.crawl import AsyncCrawler, crawl_and_aggregate
+from scraper.http_pool import SessionPool
+from scraper.page_cache import PageCache
+from scraper.rate_control import RateController
+def versioned_site(serve, version, requests):
+    # One page whose ETag is its version; a matching If-None-Match gets an empty 304
+    def respond(path, headers):
+        requests.append(headers.get('If-None-Match'))
+        etag = f'"v{version[0]}"'
+        if headers.get('If-None-Match') == etag:
+            return 304, {'ETag': etag}, ''
+        status, page_headers, body = html(f'<p>Call (555) 300-000{version[0]}.</p>')
+        return status, dict(page_headers, ETag=etag), body
+    return serve(respond, request_headers=True)
+def crawl(url, cache, engine):
+    if engine == 'async':
+        async def run():
+            async with AsyncCrawler(0, 1, False, lambda message: None, page_cache=cache) as crawler:
+                return await crawler.crawl(url)
+        return asyncio.run(run())[2]
+    pool = SessionPool()
+    try:
+        return crawl_and_aggregate(url, 0, 1, False, lambda message: None, pool, page_cache=cache, rate=RateController(0))[2]
+    finally:
+        pool.close()
+@pytest.mark.parametrize('engine', ['async', 'threads'])
+def test_fresh_pages_are_served_locally(tmp_path, serve, engine):
+    requests = []
+    url = versioned_site(serve, [1], requests)
+    cache = PageCache(str(tmp_path / 'pages.sqlite3'))
+    assert crawl(url, cache, engine) == crawl(url, cache, engine) == '(555) 300-0001'
+    assert requests == [None]
+    assert (cache.hits, cache.revalidated, cache.misses) == (1, 0, 1)
+    cache.close()
+@pytest.mark.parametrize('engine', ['async', 'threads'])
+def test_stale_pages_are_revalidated(tmp_path, serve, engine):
+    requests = []
+    version = [1]
+    url = versioned_site(serve, version, requests)
+    cache = PageCache(str(tmp_path / 'pages.sqlite3'), max_age=0)
+    assert crawl(url, cache, engine) == '(555) 300-0001'
+    assert crawl(url, cache, engine) == '(555) 300-0001' # From the 304
+    version[0] = 2
+    assert crawl(url, cache, engine) == '(555) 300-0002'
+    assert requests == [None, '"v1"', '"v1"']
+    assert (cache.hits, cache.revalidated, cache.misses) == (0, 1, 2)
+    assert cache.lookup(url).etag == '"v2"'
+    assert '33% served from cache' in str(cache)
+    cache.close()
+def test_least_recently_used_pages_are_evicted_over_the_size_cap(tmp_path):
+    path = str(tmp_path / 'pages.sqlite3')
+    cache = PageCache(path, max_bytes=2500)
+    page = lambda: os.urandom(1000).hex() # Over 1000 bytes even compressed
+    for url in ('a', 'b'):
+        cache.record(url, 200, {}, page(), None)
+        time.sleep(0.01)
+    cache.serve_fresh('a', cache.lookup('a')) # b is now the least recently used
+    time.sleep(0.01)
+    cache.record('c', 200, {}, page(), None)
+    assert [url for url in 'abc' if cache.lookup(url)] == ['a', 'c']
+    cache.record('d', 200, {}, page(), None)
+    assert [url for url in 'abcd' if cache.lookup(url)] == ['c', 'd']
+    cache.record('e', 404, {}, 'Not here', None)
+    assert cache.lookup('e') is None and cache.misses == 5
+    cache.close()
+    # The size on disk is picked up again by the next run
+    reopened = PageCache(path, max_bytes=2500)
+    assert 1500 < reopened._bytes <= 2500
+    reopened.close()
+def test_worker_processes_can_share_the_cache_file(tmp_path):
+    path = str(tmp_path / 'pages.sqlite3')
+    caches = [PageCache(path) for _ in range(2)]
+    assert [cache._db.execute('PRAGMA journal_mode').fetchone()[0] for cache in caches] == ['wal', 'wal']
+    # A write transaction held by one process does not block the other's reads
+    caches[0].record('a', 200, {}, 'page a', None)
+    caches[0]._db.execute('BEGIN IMMEDIATE')
+    caches[0]._db.execute("INSERT OR REPLACE INTO pages (url, accessed_at) VALUES ('b', 0)")
+    assert caches[1].lookup('a').body == 'page a'
+    caches[0]._db.commit()
+    caches[1].record('c', 200, {}, 'page c', None)
+    assert caches[0].lookup('c').body == 'page c'
+    for cache in caches:
+        cache.close()
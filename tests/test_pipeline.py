@@ -0,0 +1,113 @@
+import asyncio
+import time
+from conftest import html
+from scraper.config import ScrapeConfig
+from scraper.maps import MapsWaits
+from scraper.pipeline import run_pipeline
+from scraper.task_queue import SqliteTaskQueue
+MAPS_RESULT_SECONDS = 0.2 # Time the fake Maps scraper takes per result
+class FakeBrowser:
+    # Stands in for MapsBrowser; records whether the job opened and closed it
+    def __init__(self):
+        self.opened = self.closed = 0
+   
+    async def __aenter__(self):
+        self.opened += 1
+        return self
+   
+    async def __aexit__(self, *exc_info):
+        self.closed += 1
+def business_site(serve, number, requests):
+    def respond(path):
+        requests.append(time.perf_counter())
+        return html(f'<p>Call (555) 300-{number:04d} or <a href="mailto:info@b{number}.example">write</a>.</p>')
+    return serve(respond)
+def fake_maps(sites, maps_done, waits_seen=None):
+    # scrape_google_maps_async stand-in: one record per site of the query, each after a delay
+    async def scrape(query, max_results, non_headless, update, progress, browser=None, record_callback=None, waits=None,
+                     detail_mode=None):
+        assert isinstance(browser, FakeBrowser)
+        if waits_seen is not None:
+            waits_seen.append(waits)
+        records = []
+        for number, url in sites[query]:
+            await asyncio.sleep(MAPS_RESULT_SECONDS)
+            record = {'name': f'{query} {number}', 'address': f'{number} Main St', 'website': url}
+            records.append(record)
+            await record_callback(record)
+        maps_done[query] = time.perf_counter()
+        return records
+    return scrape
+def test_crawls_overlap_with_maps_and_reports_are_per_query(serve):
+    requests = []
+    sites = {query: [(number, business_site(serve, number, requests)) for number in numbers]
+             for query, numbers in (('cafes', range(0, 3)), ('bakeries', range(3, 6)))}
+    maps_done = {}
+    browser = FakeBrowser()
+    reports = []
+    config = ScrapeConfig(check_robots=False, parse_workers=0, concurrency=4, max_depth=0)
+   
+    async def collect():
+        return [record async for record in run_pipeline(config, queries=list(sites), reports=reports, browser=browser,
+                                                         scrape_maps=fake_maps(sites, maps_done))]
+    records = asyncio.run(collect())
+   
+    assert (browser.opened, browser.closed) == (1, 1) # One browser for the whole batch
+    assert sorted(record['phones'] for record in records) == [f'(555) 300-{n:04d}' for n in range(6)]
+    # Websites of the first query were crawled while Maps was still scraping, for both queries
+    assert min(requests) < maps_done['cafes'] < maps_done['bakeries']
+    assert sum(1 for t in requests if t < maps_done['bakeries']) >= 3
+    assert [report.query for report in reports] == ['cafes', 'bakeries']
+    assert [(report.results, report.crawled, report.skipped) for report in reports] == [(3, 3, 0), (3, 3, 0)]
+    assert all(report.finished for report in reports)
+def test_records_already_saved_are_skipped(serve):
+    requests = []
+    sites = {'cafes': [(number, business_site(serve, number, requests)) for number in range(3)]}
+    skip = [{'name': 'cafes 1', 'address': '1 Main St'}]
+    reports = []
+    config = ScrapeConfig(check_robots=False, parse_workers=0, max_depth=0)
+   
+    class Seen:
+        def __contains__(self, record):
+            return any(record['name'] == saved['name'] for saved in skip)
+   
+    async def collect():
+        return [record async for record in run_pipeline(config, queries=['cafes'], skip=Seen(), reports=reports,
+                                                         browser=FakeBrowser(), scrape_maps=fake_maps(sites, {}))]
+    records = asyncio.run(collect())
+    assert sorted(record['name'] for record in records) == ['cafes 0', 'cafes 2']
+    assert (reports[0].results, reports[0].skipped, len(requests)) == (3, 1, 2)
+def test_maps_wait_limits_come_from_the_config(serve):
+    sites = {'cafes': [(0, business_site(serve, 0, []))]}
+    waits_seen = []
+    config = ScrapeConfig(check_robots=False, parse_workers=0, max_depth=0, maps_waits='results=20000, idle_scrolls=4')
+   
+    async def collect():
+        return [record async for record in run_pipeline(config, browser=FakeBrowser(), scrape_maps=fake_maps(sites, {}, waits_seen),
+                                                         queries=['cafes'])]
+    assert len(asyncio.run(collect())) == 1
+    assert (waits_seen[0].results, waits_seen[0].idle_scrolls, waits_seen[0].scroll) == (20000, 4, MapsWaits().scroll)
+def test_task_queue_jobs_queue_up_to_the_queue_depth(tmp_path):
+    # --concurrency applies per worker; the job itself keeps --queue-depth websites queued
+    path = str(tmp_path / 'tasks.sqlite3')
+    sites = {'cafes': [(number, f'http://b{number}.example/') for number in range(4)]}
+    config = ScrapeConfig(check_robots=False, parse_workers=0, concurrency=1, queue_depth=4, task_queue=path)
+   
+    async def job():
+        async for record in run_pipeline(config, queries=['cafes'], browser=FakeBrowser(), scrape_maps=fake_maps(sites, {})):
+            pass
+   
+    async def queued_without_workers():
+        running = asyncio.ensure_future(job())
+        queue = SqliteTaskQueue(path)
+        try:
+            for _ in range(50):
+                await asyncio.sleep(0.1)
+                if queue.counts().get('pending') == 4:
+                    break
+            return queue.counts()
+        finally:
+            running.cancel()
+            await asyncio.gather(running, return_exceptions=True)
+            queue.close()
+    assert asyncio.run(queued_without_workers()) == {'pending': 4}
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import pytest
+from conftest import html
+from scraper.crawl import AsyncCrawler, crawl_and_aggregate
+from scraper.http_pool import SessionPool
+from scraper.rate_control import RATE_SPEEDUP_AFTER, RETRY_BUDGET_MIN, RateController, parse_retry_after
+PAGES = 3
+def scripted_site(serve, failures):
+    # Every page carries its own phone; failures(path, hit) gives the error answer for the
+    # hit-th request (from 1) to path, or None to serve the page
+    hits = {}
+    lock = threading.Lock()
+    def respond(path):
+        with lock:
+            hits[path] = hits.get(path, 0) + 1
+            failure = failures(path, hits[path])
+        if failure:
+            return failure
+        number = 0 if path == '/' else int(path.rsplit('-', 1)[-1])
+        links = ''.join(f'<a href="/contact-{i}">Office {i}</a> ' for i in range(1, PAGES))
+        return html(f'<p>Call (555) 300-{number:04d}.</p>{links}')
+    return serve(respond), hits
+def all_phones(result):
+    return result[2] == '; '.join(f'(555) 300-{number:04d}' for number in range(PAGES))
+async def crawl_async(url, rate):
+    async with AsyncCrawler(1, PAGES, False, lambda message: None, per_host=1, rate=rate) as crawler:
+        return await crawler.crawl(url)
+def test_retry_after_is_read_as_seconds_or_a_date():
+    assert parse_retry_after('3') == 3
+    assert parse_retry_after('-1') == 0
+    assert parse_retry_after('') is None and parse_retry_after('soon') is None
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 < parse_retry_after(later) <= 30
+def test_throttling_slows_a_host_until_it_keeps_up():
+    messages = []
+    rate = RateController(0.5, messages.append)
+    rate.record('a.example', 429, '2')
+    assert rate.hosts['a.example'].interval == 1.0
+    assert rate.reserve('a.example') > 1.5 # Retry-After is waited out
+    assert rate.reserve('b.example') == 0 # Other hosts are not held up
+    for _ in range(RATE_SPEEDUP_AFTER):
+        rate.record('a.example', 200)
+    assert rate.hosts['a.example'].interval == pytest.approx(0.8)
+    assert 'slowing' in messages[0] and 'speeding up' in messages[-1]
+def test_retries_stop_at_the_attempt_limit_and_the_host_budget():
+    rate = RateController(0, max_retries=3)
+    assert rate.retry_delay('a.example', 3) is None
+    assert all(rate.retry_delay('b.example', 0) is not None for _ in range(RETRY_BUDGET_MIN))
+    assert rate.retry_delay('b.example', 0) is None
+    assert rate.gave_up == 2
+def test_throttled_host_is_slowed_and_its_pages_are_recovered(serve):
+    url, hits = scripted_site(serve, lambda path, hit: (429, {'Retry-After': '1'}, 'Slow down') if path == '/' and hit == 1 else None)
+    rate = RateController(0.05)
+    started = time.monotonic()
+    result = asyncio.run(crawl_async(url, rate))
+    assert all_phones(result)
+    assert hits['/'] == 2 and time.monotonic() - started >= 1
+    host = rate.hosts[url.split('/')[2]]
+    assert host.throttled == 1 and host.interval > 0.05
+@pytest.mark.parametrize('engine', ['async', 'threads'])
+def test_flaky_pages_are_retried(serve, engine):
+    url, hits = scripted_site(serve, lambda path, hit: (502, {}, 'Bad gateway') if hit == 1 else None)
+    rate = RateController(0)
+    if engine == 'async':
+        result = asyncio.run(crawl_async(url, rate))
+    else:
+        pool = SessionPool()
+        result = crawl_and_aggregate(url, 1, PAGES, False, lambda message: None, pool, rate=rate)
+        pool.close()
+    assert all_phones(result)
+    assert sorted(hits.values()) == [2] * PAGES
+    assert rate.hosts[url.split('/')[2]].retries == PAGES and rate.gave_up == 0
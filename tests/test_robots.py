@@ -0,0 +1,42 @@
+from conftest import html
+from scraper.cli import build_parser, config_from_args
+from scraper.config import ScrapeConfig
+from scraper.metrics import METRICS
+from scraper.robots import RobotsCache, check_robots_txt
+from scraper.http_pool import SessionPool
+def robots_site(serve, fetches):
+    def respond(path):
+        if path == '/robots.txt':
+            fetches.append(path)
+            return 200, {'Content-Type': 'text/plain'}, 'User-agent: *\nDisallow: /private\n'
+        return html('ok')
+    return serve(respond)
+def test_rules_are_fetched_once_and_applied(serve):
+    fetches = []
+    url = robots_site(serve, fetches)
+    cache, pool = RobotsCache(), SessionPool()
+    METRICS.reset()
+    assert check_robots_txt(url + 'menu', pool, cache)
+    assert not check_robots_txt(url + 'private/page', pool, cache)
+    assert fetches == ['/robots.txt']
+    assert (METRICS.counters[('robots.cache_misses', '')], METRICS.counters[('robots.cache_hits', '')]) == (1, 1)
+    pool.close()
+def test_cache_file_is_reused_by_the_next_run(serve, tmp_path):
+    fetches = []
+    url = robots_site(serve, fetches)
+    path = str(tmp_path / 'robots.json')
+    pool = SessionPool()
+    first = RobotsCache()
+    first.use_file(path)
+    assert not check_robots_txt(url + 'private', pool, first)
+    first.save()
+    second = RobotsCache()
+    second.use_file(path)
+    assert not check_robots_txt(url + 'private', pool, second)
+    assert fetches == ['/robots.txt']
+    pool.close()
+def test_cli_sets_the_cache_file():
+    config = config_from_args(build_parser().parse_args(['cafes', '--robots-cache', 'robots.json']))
+    assert config.robots_cache == 'robots.json'
+    assert config_from_args(build_parser().parse_args(['cafes'])).robots_cache == ''
+    assert ScrapeConfig.from_dict({'robots_cache': 'robots.json'}).robots_cache == 'robots.json'
@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+import pytest
+from scraper.sinks import open_sink, parquet_available
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+def records(start, stop):
+    return [{'name': f'Business {i}', 'address': f'{i} Main St', 'emails': f'info@b{i}.example'} for i in range(start, stop)]
+@pytest.mark.parametrize('extension', ['.csv', '.jsonl'] + (['.parquet'] if parquet_available() else []))
+def test_existing_output_is_resumed(tmp_path, extension):
+    path = str(tmp_path / f'out{extension}')
+    with open_sink(path, batch_size=3) as sink:
+        for record in records(0, 5):
+            sink.write(record)
+    with open_sink(path, batch_size=3) as sink:
+        assert len(sink.seen) == 5 and records(0, 1)[0] in sink
+        for record in records(5, 7):
+            sink.write(record)
+    with open_sink(path) as sink:
+        assert len(sink.seen) == 7
+@pytest.mark.parametrize('extension', ['.csv', '.jsonl'])
+def test_a_half_written_last_line_is_dropped_on_resume(tmp_path, extension):
+    path = str(tmp_path / f'out{extension}')
+    with open_sink(path) as sink:
+        sink.write(records(0, 1)[0])
+    # Killed while writing the second record
+    with open(path, 'rb') as f:
+        last = f.read().splitlines(keepends=True)[-1]
+    with open(path, 'ab') as f:
+        f.write(last.replace(b'0', b'1')[:len(last) // 2])
+    with open_sink(path) as sink:
+        assert len(sink.seen) == 1
+        sink.write(records(2, 3)[0])
+    with open_sink(path) as sink:
+        assert sorted(name for name, address in sink.seen) == ['business 0', 'business 2']
+def test_a_half_written_header_is_rewritten(tmp_path):
+    path = str(tmp_path / 'out.csv')
+    with open(path, 'w') as f:
+        f.write('name,addr')
+    with open_sink(path) as sink:
+        sink.write(records(0, 1)[0])
+    with open_sink(path) as sink:
+        assert sink.seen == {('business 0', '0 main st')}
+@pytest.mark.skipif(not parquet_available(), reason='pyarrow is not installed')
+def test_parquet_batches_survive_a_hard_kill(tmp_path):
+    path = str(tmp_path / 'out.parquet')
+    # Two full batches flushed, a third one buffered, then the process dies without closing
+    script = ('import os, sys\nsys.path.insert(0, sys.argv[2])\nfrom scraper.sinks import open_sink\n'
+              "sink = open_sink(sys.argv[1], batch_size=10)\n"
+              "for i in range(25):\n    sink.write({'name': f'Business {i}', 'address': f'{i} Main St'})\n"
+              'os._exit(9)\n')
+    assert subprocess.run([sys.executable, '-c', script, path, ROOT]).returncode == 9
+    with open_sink(path, batch_size=10) as sink:
+        assert len(sink.seen) == 20
+        for record in records(20, 25):
+            sink.write(record)
+    import pyarrow.parquet
+    assert pyarrow.parquet.read_table(path).num_rows == 25
+    assert not os.path.exists(path + '.parts')
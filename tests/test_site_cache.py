@@ -0,0 +1,69 @@
+import asyncio
+import os
+import pytest
+from scraper.site_cache import SiteResultCache, result_key
+@pytest.mark.parametrize('first, second', [('https://www.example.com/', 'http://example.com/menu?utm_source=maps'),
+                                           ('https://www.facebook.com/joes-pizza', 'https://facebook.com/joes-pizza/'),
+                                           ('https://m.facebook.com/profile.php?id=12', 'https://m.facebook.com/profile.php?id=12&fbclid=x')])
+def test_same_business_shares_a_key(first, second):
+    assert result_key(first) == result_key(second)
+@pytest.mark.parametrize('first, second', [('https://www.facebook.com/joes-pizza', 'https://facebook.com/marias-cafe'),
+                                           ('https://sites.google.com/view/bakery', 'https://sites.google.com/view/florist'),
+                                           ('https://linktr.ee/barber', 'https://linktr.ee/tailor'),
+                                           ('https://example.com/', 'https://example.org/')])
+def test_different_businesses_get_different_keys(first, second):
+    assert result_key(first) != result_key(second)
+def run_crawls(cache, urls):
+    crawled = []
+    async def crawl(url):
+        crawled.append(url)
+        await asyncio.sleep(0.01)
+        return [f'info@site{len(crawled)}.example', 'Not found', 'Not found', url]
+    async def run():
+        return await asyncio.gather(*(cache.crawl(url, crawl) for url in urls))
+    return asyncio.run(run()), crawled
+def test_shared_platform_pages_are_crawled_separately():
+    cache = SiteResultCache()
+    results, crawled = run_crawls(cache, ['https://www.facebook.com/joes-pizza', 'https://facebook.com/marias-cafe',
+                                          'https://www.example.com/', 'https://example.com/contact'])
+    assert len(crawled) == 3
+    assert results[0] != results[1] and results[2] == results[3]
+    cache.close()
+def stored_run(path, urls, result, settings=None):
+    cache = SiteResultCache(path, settings=settings)
+    crawled = []
+    async def crawl(url):
+        crawled.append(url)
+        return result
+    async def run():
+        return [await cache.crawl(url, crawl) for url in urls]
+    results = asyncio.run(run())
+    cache.close()
+    return results, crawled
+FOUND = ['info@example.com', 'Not found', '(555) 300-0001', 'Not found']
+def test_results_are_reused_by_later_runs_with_the_same_settings(tmp_path):
+    path = str(tmp_path / 'sites.sqlite3')
+    assert stored_run(path, ['https://example.com/'], FOUND, [2, 30, True])[1] == ['https://example.com/']
+    assert stored_run(path, ['https://www.example.com/'], FOUND, [2, 30, True]) == ([FOUND], [])
+    # Another depth, page limit or robots.txt setting crawls again
+    assert stored_run(path, ['https://example.com/'], FOUND, [2, 30, False])[1] == ['https://example.com/']
+    assert stored_run(path, ['https://example.com/'], FOUND, [3, 30, True])[1] == ['https://example.com/']
+@pytest.mark.parametrize('result', [['Not found'] * 4, ['Robots.txt disallows scraping', 'Not found', 'Not found', 'Not found']])
+def test_empty_and_skipped_results_are_not_stored(tmp_path, result):
+    path = str(tmp_path / 'sites.sqlite3')
+    # Within a run the result is still shared
+    assert stored_run(path, ['https://example.com/', 'https://example.com/about'], result)[1] == ['https://example.com/']
+    assert stored_run(path, ['https://example.com/'], FOUND)[1] == ['https://example.com/']
+def test_jobs_keep_results_in_the_configured_file(tmp_path, serve):
+    from scraper.config import ScrapeConfig
+    from scraper.pipeline import run_pipeline
+    from test_pipeline import FakeBrowser, business_site, fake_maps
+    requests = []
+    sites = {'cafes': [(0, business_site(serve, 0, requests))]}
+    config = ScrapeConfig(check_robots=False, parse_workers=0, max_depth=0, site_cache=str(tmp_path / 'sites.sqlite3'))
+   
+    async def job():
+        return [record async for record in run_pipeline(config, queries=['cafes'], browser=FakeBrowser(),
+                                                         scrape_maps=fake_maps(sites, {}))]
+    assert asyncio.run(job())[0]['phones'] == asyncio.run(job())[0]['phones'] == '(555) 300-0000'
+    assert len(requests) == 1 and os.path.exists(config.site_cache)
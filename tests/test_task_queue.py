@@ -0,0 +1,42 @@
+import time
+from scraper.task_queue import SqliteTaskQueue
+def test_tasks_are_leased_once_and_their_results_returned(tmp_path):
+    queue = SqliteTaskQueue(str(tmp_path / 'tasks.sqlite3'))
+    ids = [queue.put('job', {'website': f'http://s{n}.example/'}) for n in range(3)]
+    leased = queue.lease('a', 2)
+    assert [(task.id, task.attempts) for task in leased] == [(ids[0], 1), (ids[1], 1)]
+    assert [task.id for task in queue.lease('b', 5)] == [ids[2]]
+    assert queue.lease('c') == []
+    assert queue.complete('a', ids[0], ['x'])
+    assert not queue.complete('b', ids[1], ['y']) # Not b's lease
+    assert queue.result(ids[0]) == ('done', ['x']) and queue.result(ids[1])[0] == 'leased'
+    assert queue.counts('job') == {'done': 1, 'leased': 2}
+    queue.purge('job')
+    assert queue.counts() == {} and queue.result(ids[0]) == (None, None)
+    queue.close()
+def test_expired_leases_go_to_another_worker_unless_heartbeated(tmp_path):
+    queue = SqliteTaskQueue(str(tmp_path / 'tasks.sqlite3'), lease_seconds=0.3)
+    kept, dropped = queue.put('job', {}), queue.put('job', {})
+    queue.lease('a', 2)
+    time.sleep(0.2)
+    assert queue.heartbeat('a', [kept]) == [kept]
+    time.sleep(0.2)
+    assert [(task.id, task.attempts) for task in queue.lease('b', 2)] == [(dropped, 2)]
+    assert queue.heartbeat('a', [kept, dropped]) == [kept] # a learns it lost the other task
+    assert not queue.complete('a', dropped, ['late'])
+    assert queue.complete('b', dropped, ['on time'])
+    queue.close()
+def test_tasks_fail_after_max_attempts(tmp_path):
+    queue = SqliteTaskQueue(str(tmp_path / 'tasks.sqlite3'), lease_seconds=0.1, max_attempts=2)
+    failing, expiring = queue.put('job', {}), queue.put('job', {})
+    queue.lease('a', 2)
+    queue.fail('a', failing, 'timeout')
+    assert queue.result(failing) == ('pending', 'timeout')
+    time.sleep(0.15)
+    assert [task.id for task in queue.lease('b', 2)] == [failing, expiring]
+    queue.fail('b', failing, 'timeout again')
+    time.sleep(0.15)
+    assert queue.lease('c') == []
+    assert queue.result(failing) == ('failed', 'timeout again')
+    assert queue.result(expiring) == ('failed', 'lease expired')
+    queue.close()
@@ -0,0 +1,119 @@
+import asyncio
+import multiprocessing
+import sqlite3
+import time
+import pytest
+from conftest import html
+from scraper import worker
+from scraper.config import ScrapeConfig
+from scraper.task_queue import SqliteTaskQueue
+from scraper.worker import QueuedCrawler, run_worker
+LEASE_SECONDS = 1.5
+PAGES = 3
+@pytest.fixture
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(worker, 'TASK_POLL_INTERVAL', 0.05)
+def test_job_warns_while_no_worker_takes_its_tasks(tmp_path, fast_polling):
+    path = str(tmp_path / 'tasks.sqlite3')
+    messages = []
+   
+    async def wait_unserved():
+        async with QueuedCrawler(SqliteTaskQueue(path), ScrapeConfig(task_queue=path), update_callback=messages.append,
+                                 wait_warning=0.3) as crawler:
+            crawls = asyncio.gather(crawler.crawl('http://a.example/'), crawler.crawl('http://b.example/'))
+            await asyncio.sleep(1)
+            crawls.cancel()
+            await asyncio.gather(crawls, return_exceptions=True)
+    asyncio.run(wait_unserved())
+    assert 2 <= len(messages) <= 4 # Repeated, but not once per task
+    assert messages[0].startswith('2 websites') and f'--worker --task-queue {path}' in messages[0]
+def test_job_does_not_warn_while_a_worker_has_its_tasks(tmp_path, fast_polling):
+    path = str(tmp_path / 'tasks.sqlite3')
+    messages = []
+   
+    async def slow_worker():
+        queue = SqliteTaskQueue(path)
+        tasks = queue.lease('w')
+        while not tasks:
+            await asyncio.sleep(0.05)
+            tasks = queue.lease('w')
+        await asyncio.sleep(0.8)
+        queue.complete('w', tasks[0].id, ['Not found'] * 4)
+        queue.close()
+   
+    async def served():
+        async with QueuedCrawler(SqliteTaskQueue(path), ScrapeConfig(task_queue=path), update_callback=messages.append,
+                                 wait_warning=0.3) as crawler:
+            return (await asyncio.gather(crawler.crawl('http://a.example/'), slow_worker()))[0]
+    assert asyncio.run(served()) == ['Not found'] * 4
+    assert messages == []
+def slow_site(serve, number):
+    # Contacts only on the last page, so a worker needs every page of the site
+    def respond(path):
+        time.sleep(0.3)
+        links = ''.join(f'<a href="/page-{i}">Page {i}</a> ' for i in range(1, PAGES))
+        contacts = f'<p>Call (555) 400-{number:04d}.</p>' if path == f'/page-{PAGES - 1}' else ''
+        return html(contacts + links)
+    return serve(respond)
+def worker_main(path, name):
+    queue = SqliteTaskQueue(path, lease_seconds=LEASE_SECONDS)
+    config = ScrapeConfig(concurrency=PAGES, parse_workers=0, check_robots=False)
+    asyncio.run(run_worker(config, queue, worker=name, idle_exit=2))
+def leased_by(path, name):
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT COUNT(*) FROM tasks WHERE status = 'leased' AND worker = ?", (name,)).fetchone()[0]
+def test_tasks_of_a_killed_worker_are_finished_by_another(tmp_path, serve):
+    path = str(tmp_path / 'tasks.sqlite3')
+    urls = [slow_site(serve, number) for number in range(3)]
+    config = ScrapeConfig(max_pages=PAGES, check_robots=False)
+    spawn = multiprocessing.get_context('spawn')
+   
+    async def job():
+        async with QueuedCrawler(SqliteTaskQueue(path, lease_seconds=LEASE_SECONDS), config, job='failover') as crawler:
+            crawls = asyncio.gather(*(crawler.crawl(url) for url in urls))
+            worker_a = spawn.Process(target=worker_main, args=(path, 'a'))
+            worker_a.start()
+            while leased_by(path, 'a') < len(urls):
+                await asyncio.sleep(0.05)
+            await asyncio.sleep(0.3) # Part way through the first pages
+            worker_a.kill()
+            worker_a.join()
+            worker_b = spawn.Process(target=worker_main, args=(path, 'b'))
+            worker_b.start()
+            results = await asyncio.wait_for(crawls, 60)
+            with sqlite3.connect(path) as db:
+                rows = db.execute("SELECT worker, attempts, status FROM tasks WHERE job = 'failover'").fetchall()
+            await asyncio.get_running_loop().run_in_executor(None, worker_b.join)
+        return results, rows
+    results, rows = asyncio.run(job())
+    assert [result[2] for result in results] == [f'(555) 400-{number:04d}' for number in range(3)]
+    assert rows == [('b', 2, 'done')] * 3
+class CountingQueue(SqliteTaskQueue):
+    def __init__(self, path):
+        super().__init__(path)
+        self.polls = 0
+   
+    def results(self, task_ids):
+        self.polls += 1
+        return super().results(task_ids)
+def test_one_poll_serves_every_waiting_crawl(tmp_path, fast_polling):
+    path = str(tmp_path / 'tasks.sqlite3')
+    queue = CountingQueue(path)
+   
+    async def fast_worker():
+        workers_queue = SqliteTaskQueue(path, max_attempts=1)
+        await asyncio.sleep(0.5)
+        for task in workers_queue.lease('w', 1000):
+            if task.payload['website'].endswith('/13'):
+                workers_queue.fail('w', task.id, 'boom')
+            workers_queue.complete('w', task.id, [task.payload['website']] + ['Not found'] * 3)
+        workers_queue.close()
+   
+    async def job():
+        async with QueuedCrawler(queue, ScrapeConfig(task_queue=path), job='many') as crawler:
+            crawls = [crawler.crawl(f'http://s.example/{n}') for n in range(200)]
+            return await asyncio.gather(*crawls, fast_worker(), return_exceptions=True)
+    results = asyncio.run(job())[:200]
+    assert [result[0] for n, result in enumerate(results) if n != 13] == [f'http://s.example/{n}' for n in range(200) if n != 13]
+    assert isinstance(results[13], RuntimeError)
+    assert queue.polls < 20 # One query per poll interval, not one per task